@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import random
+import string
+import resource
+import argparse
+import platform
+import tracemalloc
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The generators of both scripts live in common/junkgen.py.
+sys.path.insert(0, os.path.join(ROOT, "common"))
+import junkgen
+
+REPORT_FORMAT = 1            # Version of the JSON report; bumped when its fields change meaning.
+DEFAULT_SIZES = "1K,64K,1M,16M,256M,1G"
+DEFAULT_REPEAT = 5           # Timed calls per case, unless they take longer than MIN_TIME in total.
+MIN_TIME = 2.0               # Seconds of timed calls after which a case stops repeating.
+DEFAULT_BUDGET = 30.0        # Seconds a single call may be expected to take before a case is skipped.
+DEFAULT_TOLERANCE = 0.10     # Fraction of MB/s a case may lose against the baseline before it is a regression.
+SEED = "bench"
+UNITS = {"K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30}
+
+def per_char_join(length):
+    """The original generator, one random.choice() per character, kept as the reference."""
+    characters = string.ascii_letters + string.digits + string.punctuation
+    return "\n".join(random.choice(characters) for _ in range(length))
+
+def build_generators(module, max_length):
+    """
+    Returns {name: (setup, generate)}: setup() prepares shared state once (untimed, or None) and
+    generate(length) produces the content of a file of length characters, returning it (or, for the
+    streaming generators, the number of bytes produced, since the content is never held whole).
+    """
+    pool = {}
+
+    def setup_pool():
+        pool["pool"] = module.ContentPool(SEED, max_length)
+
+    def stream_chunks(length):
+        return sum(len(chunk) for chunk in module.ContentStream(SEED, "bench", 1, length).chunks())
+
+    return {
+        "per_char_join": (None, per_char_join),
+        "random_string_newlined": (None, module.random_string_newlined),
+        "random_bytes_newlined": (None, module.random_bytes_newlined),
+        "content_stream_read": (None, lambda length: module.ContentStream(SEED, "bench", 1, length).read()),
+        "content_stream_chunks": (None, stream_chunks),
+        "junk_payload": (None, lambda length: module.junk_payload(SEED, "bench", 1, length)[1]),
+        "content_pool_window": (setup_pool, lambda length: pool["pool"].window("bench", 1, length)),
+        # What the PyGithub upload paths do with a window.
+        "content_pool_bytes": (setup_pool, lambda length: bytes(pool["pool"].window("bench", 1, length))),
+    }
+
+def parse_size(text):
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+def output_size(result):
+    return result if isinstance(result, int) else len(result)
+
+def measure(generator, content_bytes, repeat):
+    """
+    Measures one generator producing content_bytes bytes of content (half as many characters, rounded up)
+    in this process and returns its metrics. Runs in a fresh worker process per case, so the peak RSS
+    belongs to that case alone.
+    """
+    length = max(1, (content_bytes + 1) // 2)
+    setup, generate = build_generators(junkgen, length)[generator]
+    setup_seconds = 0.0
+    if setup is not None:
+        started = time.perf_counter()
+        setup()
+        setup_seconds = time.perf_counter() - started
+
+    times = []
+    size = 0
+    while len(times) < repeat and sum(times) < MIN_TIME:
+        started = time.perf_counter()
+        result = generate(length)
+        times.append(time.perf_counter() - started)
+        size = output_size(result)
+        del result
+
+    # A separate traced call, since tracemalloc slows allocation-heavy generators down.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    blocks = sys.getallocatedblocks()
+    result = generate(length)
+    retained_blocks = sys.getallocatedblocks() - blocks
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    times.sort()
+    best = times[0]
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "bytes": size,
+        "calls": len(times),
+        "best_seconds": round(best, 6),
+        "median_seconds": round(times[len(times) // 2], 6),
+        "mb_per_s": round(size / 2 ** 20 / best, 2) if best > 0 else None,
+        "setup_seconds": round(setup_seconds, 6),
+        "peak_alloc_bytes": peak - before,
+        "retained_alloc_bytes": current - before,
+        "retained_blocks": retained_blocks,
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        "peak_rss_bytes": rss if sys.platform == "darwin" else rss * 1024,
+    }
+
+def run_case(generator, content_bytes, repeat):
+    """Runs measure() in a worker process and returns its metrics, or an error string if it failed."""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", generator,
+                           str(content_bytes), str(repeat)], capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return lines[-1] if lines else f"exit code {proc.returncode}"
+    return json.loads(proc.stdout)
+
+def format_bytes(size):
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+def format_row(generator, size, metrics):
+    if isinstance(metrics, str):
+        return f"{generator:<24} {format_bytes(size):>6}  {metrics}"
+    return (f"{generator:<24} {format_bytes(size):>6} {metrics['mb_per_s'] or 0:>10.2f} "
+            f"{metrics['best_seconds']:>10.4f} {metrics['peak_alloc_bytes'] / 2 ** 20:>11.2f} "
+            f"{metrics['peak_rss_bytes'] / 2 ** 20:>9.1f}")
+
+def compare(results, baseline_path, tolerance):
+    """
+    Prints the change in MB/s of every case against the same case of a baseline report and returns the
+    number of cases slower than the baseline by more than tolerance.
+    """
+    with open(baseline_path) as f:
+        baseline = {(case["generator"], case["size"]): case.get("metrics") for case in json.load(f)["cases"]}
+    regressions = 0
+    for case in results:
+        before = baseline.get((case["generator"], case["size"]))
+        metrics = case.get("metrics")
+        if not isinstance(before, dict) or not isinstance(metrics, dict) or not before["mb_per_s"]:
+            continue
+        change = metrics["mb_per_s"] / before["mb_per_s"] - 1
+        regressed = change < -tolerance
+        regressions += regressed
+        print(f"{case['generator']} {format_bytes(case['size'])}: {change:+.1%} MB/s against the baseline" +
+              (" - REGRESSION" if regressed else "") + ".")
+    return regressions
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        json.dump(measure(sys.argv[2], int(sys.argv[3]), int(sys.argv[4])), sys.stdout)
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Measures the throughput and memory of the junk content generators across content sizes.")
+    parser.add_argument("--generators", help="comma-separated generators to measure (default: all)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated content sizes in bytes, with optional K/M/G suffixes")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed calls per case")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help="skip a case whose single call is expected to take longer (seconds)")
+    parser.add_argument("--output", default="generators.json", help="JSON report to write")
+    parser.add_argument("--baseline", help="earlier JSON report to compare MB/s against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="fraction of MB/s a case may lose against the baseline")
+    args = parser.parse_args()
+
+    available = list(build_generators(junkgen, 1))
+    generators = args.generators.split(",") if args.generators else available
+    unknown = [name for name in generators if name not in available]
+    if unknown:
+        parser.error(f"unknown generator(s): {', '.join(unknown)} (choose from {', '.join(available)})")
+    sizes = sorted(parse_size(size) for size in args.sizes.split(","))
+
+    print(f"{'generator':<24} {'size':>6} {'MB/s':>10} {'best s':>10} {'peak MiB':>11} {'RSS MiB':>9}")
+    results = []
+    for generator in generators:
+        rate = None
+        for size in sizes:
+            # Larger sizes are skipped once the last measured rate says a single call would exceed the budget.
+            if rate and size / rate > args.budget:
+                metrics = f"skipped: expected {size / rate:.0f}s per call, over the {args.budget:.0f}s budget"
+            else:
+                metrics = run_case(generator, size, args.repeat)
+                if isinstance(metrics, dict) and metrics["best_seconds"] > 0:
+                    rate = metrics["bytes"] / metrics["best_seconds"]
+            results.append({"generator": generator, "size": size, "metrics": metrics})
+            print(format_row(generator, size, metrics))
+
+    report = {
+        "format": REPORT_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "cases": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}.")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} case(s) regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import itertools
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON = os.path.join(ROOT, "common")
+sys.path.insert(0, os.path.join(ROOT, "mock"))
+from server import MockGitHub
+
+SCRIPTS = {
+    "org": os.path.join(ROOT, "org", "pyhon.py"),
+    "repo": os.path.join(ROOT, "repo", "python.py"),
+}
+SAMPLE_INTERVAL = 0.05       # Seconds between samples of the thread count of a running case.
+DEFAULT_TIMEOUT = 600        # Seconds after which a case is killed and reported as timed out.
+DEFAULT_RATE_LIMIT = 10 ** 9  # Mock rate limit, high enough that only the scripts' own pacing applies.
+DEFAULT_TOLERANCE = 0.10     # Fraction of files/sec a case may lose against the baseline before it is a regression.
+# PyGithub's own pacing (1s between writes by default) would hide the scripts' throughput; --set overrides these.
+DEFAULT_SETTINGS = {"SECONDS_BETWEEN_REQUESTS": "0", "SECONDS_BETWEEN_WRITES": "0"}
+
+def int_list(text):
+    return [int(value) for value in text.split(",")]
+
+def float_list(text):
+    return [float(value) for value in text.split(",")]
+
+def percentile(sorted_values, fraction):
+    """Returns the nearest-rank percentile of sorted_values (None if empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+def build_cases(args):
+    """
+    Returns the benchmark cases of the matrix given on the command line, one dict of parameters each.
+    The repo workflow fills a single repository, so it only runs with a repository count of 1.
+    """
+    cases = []
+    for workflow, repos, files, size, concurrency, latency in itertools.product(
+            args.workflows.split(","), args.repos, args.files, args.sizes, args.concurrency, args.latency):
+        if workflow == "repo":
+            repos = 1
+        case = {"workflow": workflow, "repos": repos, "files": files, "size": size,
+                "concurrency": concurrency, "latency": latency}
+        if case not in cases:
+            cases.append(case)
+    return cases
+
+def write_config(path, case, base_url, prefix, settings):
+    lines = [
+        "GITHUB_TOKEN=bench",
+        "ORG_NAME=bench",
+        f"API_BASE_URL={base_url}",
+        f"MAX_CONCURRENCY={case['concurrency']}",
+    ]
+    if case["workflow"] == "org":
+        lines.append(f"REPO_NAME_PREFIX={prefix}")
+    else:
+        lines.append(f"REPO_NAME={prefix}repo")
+    lines.extend(f"{key}={value}" for key, value in settings.items())
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def sample_threads(pid, peak, done):
+    """Keeps peak["threads"] at the highest thread count of process pid until done is set (Linux only)."""
+    status_path = f"/proc/{pid}/status"
+    while not done.wait(SAMPLE_INTERVAL):
+        try:
+            with open(status_path) as f:
+                for line in f:
+                    if line.startswith("Threads:"):
+                        peak["threads"] = max(peak["threads"] or 0, int(line.split()[1]))
+                        break
+        except OSError:
+            return
+
+def run_script(script, answers, timeout):
+    """
+    Runs script in its own process with answers on stdin and returns (exit code, wall seconds, peak RSS in
+    bytes, peak thread count, timed out). The RSS comes from the rusage of that one child process.
+    """
+    peak = {"threads": None}
+    done = threading.Event()
+    started = time.perf_counter()
+    # The scratch copy of the script finds common/junkgen.py through PYTHONPATH.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [COMMON, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.Popen([sys.executable, script], cwd=os.path.dirname(script), stdin=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    sampler = threading.Thread(target=sample_threads, args=(proc.pid, peak, done), daemon=True)
+    sampler.start()
+    proc.stdin.write(answers.encode())
+    proc.stdin.close()
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - started
+    timed_out = not timer.is_alive()
+    timer.cancel()
+    done.set()
+    sampler.join()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return proc.returncode, elapsed, rss, peak["threads"], timed_out
+
+def count_files(mock, prefix):
+    """Returns the number of files on the default branch of the mock repositories named with prefix."""
+    total = 0
+    for repo in list(mock.repos.values()):
+        if repo.name.startswith(prefix) and repo.default_branch in repo.refs:
+            total += sum(1 for path in repo.head_files(repo.default_branch) if path != "README.md")
+    return total
+
+def run_case(case, args, settings, number):
+    """
+    Runs one case against a fresh mock server in a scratch copy of its script and returns the case with
+    its metrics.
+    """
+    mock = MockGitHub(latency=case["latency"], jitter=args.jitter, rate_limit=args.rate_limit,
+                      max_concurrent=args.max_concurrent)
+    base_url = mock.start()
+    workdir = tempfile.mkdtemp(prefix="junk-bench-")
+    try:
+        script = os.path.join(workdir, os.path.basename(SCRIPTS[case["workflow"]]))
+        shutil.copy(SCRIPTS[case["workflow"]], script)
+        prefix = f"bench-{number}-"
+        write_config(os.path.join(workdir, "config.txt"), case, base_url, prefix, settings)
+        if case["workflow"] == "org":
+            answers = f"{args.mode}\n{case['repos']}\n{case['files']}\n{case['size']}\n"
+        else:
+            answers = f"{args.mode}\n{case['files']}\n{case['size']}\n"
+        exit_code, elapsed, rss, threads, timed_out = run_script(script, answers, args.timeout)
+    finally:
+        mock.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    files = count_files(mock, prefix)
+    # Client-side request latencies: from reading each request line to writing its response (see MockGitHub).
+    latencies = sorted(mock.latencies)
+    result = dict(case)
+    result["metrics"] = {
+        "exit_code": exit_code,
+        "timed_out": timed_out,
+        "seconds": round(elapsed, 3),
+        "files_expected": case["repos"] * case["files"],
+        "files_uploaded": files,
+        "files_per_sec": round(files / elapsed, 2),
+        "requests": mock.requests,
+        "requests_rejected": mock.rejected,
+        "requests_per_sec": round(mock.requests / elapsed, 2),
+        "latency_p50_ms": None if not latencies else round(percentile(latencies, 0.50) * 1000, 3),
+        "latency_p95_ms": None if not latencies else round(percentile(latencies, 0.95) * 1000, 3),
+        "latency_p99_ms": None if not latencies else round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_bytes": rss,
+        "peak_threads": threads,
+    }
+    return result
+
+def case_key(case):
+    return tuple(case[key] for key in ("workflow", "repos", "files", "size", "concurrency", "latency"))
+
+def compare(results, baseline_path, tolerance):
+    """
+    Prints the change in files/sec of every case against the same case of a baseline report and returns
+    the number of cases slower than the baseline by more than tolerance.
+    """
+    with open(baseline_path) as f:
+        baseline = {case_key(case): case["metrics"] for case in json.load(f)["cases"]}
+    regressions = 0
+    for case in results:
+        before = baseline.get(case_key(case))
+        if before is None or not before["files_per_sec"]:
+            continue
+        change = case["metrics"]["files_per_sec"] / before["files_per_sec"] - 1
+        regressed = change < -tolerance
+        regressions += regressed
+        print(f"{format_case(case)}: {change:+.1%} files/sec against the baseline" +
+              (" - REGRESSION" if regressed else "") + ".")
+    return regressions
+
+def format_case(case):
+    return (f"{case['workflow']} repos={case['repos']} files={case['files']} size={case['size']} "
+            f"concurrency={case['concurrency']} latency={case['latency']}")
+
+def parse_settings(pairs):
+    settings = dict(DEFAULT_SETTINGS)
+    for pair in pairs:
+        if "=" not in pair:
+            raise SystemExit(f"Invalid --set '{pair}': expected KEY=VALUE.")
+        key, value = pair.split("=", 1)
+        settings[key.strip()] = value.strip()
+    return settings
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs the org and repo scripts against the local mock server over a matrix of cases and "
+                    "reports their throughput as JSON.")
+    parser.add_argument("--workflows", default="org,repo", help="comma-separated workflows: org, repo")
+    parser.add_argument("--repos", type=int_list, default=[1, 4], help="comma-separated repository counts (org)")
+    parser.add_argument("--files", type=int_list, default=[50], help="comma-separated files per repository")
+    parser.add_argument("--sizes", type=int_list, default=[100, 10000], help="comma-separated characters per file")
+    parser.add_argument("--concurrency", type=int_list, default=[16], help="comma-separated MAX_CONCURRENCY values")
+    parser.add_argument("--latency", type=float_list, default=[0.0, 0.05],
+                        help="comma-separated simulated request latencies in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds per request")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT, help="mock requests per hour")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="mock secondary rate limit")
+    parser.add_argument("--mode", default="F", help="execution speed answered to the scripts: F, A or S")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra config.txt setting of every case, e.g. ENGINE=async (repeatable)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a case is killed")
+    parser.add_argument("--output", default="bench_results.json", help="JSON report to write")
+    parser.add_argument("--baseline", help="earlier JSON report to compare files/sec against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="fraction of files/sec a case may lose against the baseline")
+    args = parser.parse_args()
+    settings = parse_settings(args.set)
+
+    cases = build_cases(args)
+    print(f"Running {len(cases)} benchmark case(s).")
+    results = []
+    for number, case in enumerate(cases, start=1):
+        result = run_case(case, args, settings, number)
+        metrics = result["metrics"]
+        results.append(result)
+        status = " (timed out)" if metrics["timed_out"] else (
+            f" (exit code {metrics['exit_code']})" if metrics["exit_code"] else "")
+        print(f"[{number}/{len(cases)}] {format_case(case)}: {metrics['files_uploaded']}/{metrics['files_expected']} "
+              f"files in {metrics['seconds']}s, {metrics['files_per_sec']} files/s, {metrics['requests_per_sec']} "
+              f"requests/s, p50/p95/p99 {metrics['latency_p50_ms']}/{metrics['latency_p95_ms']}/"
+              f"{metrics['latency_p99_ms']} ms, peak RSS {metrics['peak_rss_bytes'] // 2 ** 20} MiB, "
+              f"{metrics['peak_threads']} threads{status}.")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "mode": args.mode,
+        "settings": settings,
+        "jitter": args.jitter,
+        "max_concurrent": args.max_concurrent,
+        "cases": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}.")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} case(s) regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
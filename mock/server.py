@@ -0,0 +1,640 @@
+import re
+import sys
+import json
+import time
+import array
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_RATE_LIMIT = 5000     # Requests per rate-limit window, as for a GitHub personal access token.
+DEFAULT_RATE_WINDOW = 3600    # Length in seconds of a rate-limit window.
+SECONDARY_RETRY_AFTER = 1     # Retry-After in seconds of a secondary rate-limit response.
+PER_PAGE = 30                 # Default page size of list endpoints.
+
+def git_blob_sha(content):
+    """Returns the git blob SHA-1 of content (bytes), as GitHub reports it."""
+    digest = hashlib.sha1(b"blob %d\0" % len(content))
+    digest.update(content)
+    return digest.hexdigest()
+
+def object_sha(*parts):
+    """Returns a SHA-1 standing in for the SHA of a tree or commit made of parts."""
+    return hashlib.sha1("\0".join(str(part) for part in parts).encode()).hexdigest()
+
+class MockRepo:
+    """
+    Git objects and branches of one mock repository.
+
+    Blobs only keep their size (and their content if the server stores contents). A tree is stored as
+    its base tree plus the paths it changes, and every branch keeps the files of its head as a plain
+    dict, so a Contents API commit costs the same however many files the repository holds.
+    """
+
+    def __init__(self, owner, name, description="", private=False, auto_init=False):
+        self.owner = owner
+        self.name = name
+        self.full_name = f"{owner}/{name}"
+        self.description = description
+        self.private = private
+        self.default_branch = "main"
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.refs = {}
+        self.branch_files = {}
+        self._tree_cache = {}
+        if auto_init:
+            readme = f"# {name}\n".encode()
+            blob = self.add_blob(readme, readme)
+            tree = self.add_tree(None, {"README.md": blob})
+            self.refs[self.default_branch] = self.add_commit("Initial commit", tree, [])
+
+    def add_blob(self, content, stored=None):
+        sha = git_blob_sha(content)
+        self.blobs[sha] = (len(content), stored)
+        return sha
+
+    def add_tree(self, base, changes):
+        sha = object_sha("tree", base, sorted(changes.items()))
+        self.trees[sha] = (base, dict(changes))
+        return sha
+
+    def add_commit(self, message, tree, parents):
+        sha = object_sha("commit", tree, parents, message, time.time())
+        self.commits[sha] = {"message": message, "tree": tree, "parents": list(parents)}
+        return sha
+
+    def files(self, tree):
+        """Returns the files (path -> blob SHA) of a tree. The result must not be modified."""
+        chain = []
+        sha = tree
+        while sha is not None and sha not in self._tree_cache:
+            base, changes = self.trees[sha]
+            chain.append(changes)
+            sha = base
+        files = dict(self._tree_cache[sha]) if sha is not None else {}
+        for changes in reversed(chain):
+            files.update(changes)
+        # Keep only the latest materialized tree; it is usually the base of the next one.
+        self._tree_cache = {tree: files}
+        return files
+
+    def head_files(self, branch):
+        """Returns the live files dict of a branch head."""
+        if branch not in self.branch_files:
+            self.branch_files[branch] = dict(self.files(self.commits[self.refs[branch]]["tree"]))
+        return self.branch_files[branch]
+
+    def move_ref(self, branch, commit):
+        self.refs[branch] = commit
+        self.branch_files.pop(branch, None)
+
+    def ancestors(self, commit):
+        seen = set()
+        pending = [commit]
+        while pending:
+            sha = pending.pop()
+            if sha not in seen:
+                seen.add(sha)
+                pending.extend(self.commits[sha]["parents"])
+        return seen
+
+    def merge_base(self, base, head):
+        head_ancestors = self.ancestors(head)
+        pending = [base]
+        seen = set()
+        while pending:
+            sha = pending.pop(0)
+            if sha in head_ancestors:
+                return sha
+            if sha not in seen:
+                seen.add(sha)
+                pending.extend(self.commits[sha]["parents"])
+        return None
+
+class MockGitHub:
+    """
+    In-process stand-in for the parts of the GitHub REST API the scripts use: the authenticated user,
+    organizations, repository creation and listing, the Contents API (create, get, update), the Git
+    Data API (blobs, trees, commits, refs), branches and merges.
+
+    Every request is delayed by latency seconds plus up to jitter seconds, and counted against a
+    rate limit of rate_limit requests per rate_window seconds, reported in the X-RateLimit-* headers
+    and answered with 403 once used up. With max_concurrent, requests beyond that many in flight get
+    a secondary rate-limit 403 with Retry-After. With conflicts, Contents API commits to a branch whose
+    head moved while they were in flight fail with 409, as concurrent commits to one branch do on
+    GitHub. Point the scripts at base_url with API_BASE_URL. For benchmarks, latencies keeps the time
+    of every answered request (rejections included) from the moment its request line was read until
+    its response was written, which is the latency a local client sees.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit=DEFAULT_RATE_LIMIT,
+                 rate_window=DEFAULT_RATE_WINDOW, max_concurrent=None, conflicts=True, store_contents=False,
+                 login="mock-user"):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.max_concurrent = max_concurrent
+        self.conflicts = conflicts
+        self.store_contents = store_contents
+        self.login = login
+        self.repos = {}
+        self.requests = 0
+        self.rejected = 0
+        self.latencies = array.array("d")  # Seconds from reading each request line to writing its response.
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._window_start = time.time()
+        self._used = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """Serves requests on a background thread and returns base_url."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY each response waits on a delayed ACK.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def parse_request(self):
+                # Called once the request line is read, so idle keep-alive time is not counted.
+                self.accepted = time.perf_counter()
+                return super().parse_request()
+
+            def _handle(self):
+                length = self.headers.get("Content-Length")
+                if length is not None:
+                    body = self.rfile.read(int(length))
+                elif self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    body = self._read_chunked()
+                else:
+                    body = b""
+                status, headers, data = mock.handle(self.command, self.path, body)
+                payload = b"" if data is None else json.dumps(data).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with mock._lock:
+                    mock.latencies.append(time.perf_counter() - self.accepted)
+
+            def _read_chunked(self):
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        return Handler
+
+    def _rate_headers(self):
+        reset = int(self._window_start + self.rate_window)
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - self._used)),
+            "X-RateLimit-Used": str(self._used),
+            "X-RateLimit-Reset": str(reset),
+        }
+
+    def handle(self, method, raw_path, body):
+        """
+        Handles one request and returns (status, headers, JSON-serializable body or None).
+        """
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now >= self._window_start + self.rate_window:
+                self._window_start = now
+                self._used = 0
+            self._in_flight += 1
+            if self._used >= self.rate_limit:
+                self.rejected += 1
+                self._in_flight -= 1
+                return 403, self._rate_headers(), {"message": "API rate limit exceeded"}
+            self._used += 1
+            if self.max_concurrent is not None and self._in_flight > self.max_concurrent:
+                self.rejected += 1
+                self._in_flight -= 1
+                headers = self._rate_headers()
+                headers["Retry-After"] = str(SECONDARY_RETRY_AFTER)
+                return 403, headers, {"message": "You have exceeded a secondary rate limit."}
+        try:
+            url = urlsplit(raw_path)
+            # Contents API commits wait inside the handler, between reading and moving the branch head.
+            if not (method == "PUT" and "/contents/" in url.path):
+                self._wait()
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                return 400, {}, {"message": "Problems parsing JSON"}
+            status, data, extra_headers = self._route(method, unquote(url.path), query, payload)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                headers = self._rate_headers()
+        headers.update(extra_headers)
+        return status, headers, data
+
+    def _wait(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    # Routing -------------------------------------------------------------------------------------
+
+    def _route(self, method, path, query, payload):
+        for route_method, pattern, handler in self._routes():
+            if route_method != method:
+                continue
+            match = re.fullmatch(pattern, path)
+            if match:
+                result = handler(query, payload, *match.groups())
+                return result if len(result) == 3 else (*result, {})
+        return 404, {"message": "Not Found"}, {}
+
+    def _routes(self):
+        repo = r"/repos/([^/]+)/([^/]+)"
+        return (
+            ("GET", r"/user", self._get_user),
+            ("GET", r"/rate_limit", self._get_rate_limit),
+            ("GET", r"/orgs/([^/]+)", self._get_org),
+            ("GET", r"/orgs/([^/]+)/repos", self._list_repos),
+            ("POST", r"/orgs/([^/]+)/repos", self._create_repo),
+            ("POST", r"/user/repos", lambda query, payload: self._create_repo(query, payload, self.login)),
+            ("GET", repo, self._get_repo),
+            ("GET", repo + r"/contents/(.+)", self._get_contents),
+            ("PUT", repo + r"/contents/(.+)", self._put_contents),
+            ("POST", repo + r"/git/blobs", self._create_blob),
+            ("GET", repo + r"/git/trees/(.+)", self._get_tree),
+            ("POST", repo + r"/git/trees", self._create_tree),
+            ("GET", repo + r"/git/commits/([0-9a-f]+)", self._get_commit),
+            ("POST", repo + r"/git/commits", self._create_commit),
+            ("GET", repo + r"/git/refs?/heads/(.+)", self._get_ref),
+            ("PATCH", repo + r"/git/refs?/heads/(.+)", self._update_ref),
+            ("DELETE", repo + r"/git/refs?/heads/(.+)", self._delete_ref),
+            ("POST", repo + r"/git/refs", self._create_ref),
+            ("GET", repo + r"/branches/(.+)", self._get_branch),
+            ("POST", repo + r"/merges", self._merge),
+        )
+
+    # JSON representations ------------------------------------------------------------------------
+
+    def _repo_url(self, repo):
+        return f"{self.base_url}/repos/{repo.full_name}"
+
+    def _repo_json(self, repo):
+        return {
+            "id": abs(hash(repo.full_name)) % 10 ** 9,
+            "name": repo.name,
+            "full_name": repo.full_name,
+            "owner": {"login": repo.owner, "url": f"{self.base_url}/users/{repo.owner}"},
+            "private": repo.private,
+            "description": repo.description,
+            "default_branch": repo.default_branch,
+            "url": self._repo_url(repo),
+        }
+
+    def _commit_json(self, repo, sha):
+        commit = repo.commits[sha]
+        url = f"{self._repo_url(repo)}/git/commits/{sha}"
+        return {
+            "sha": sha,
+            "url": url,
+            "message": commit["message"],
+            "tree": {"sha": commit["tree"], "url": f"{self._repo_url(repo)}/git/trees/{commit['tree']}"},
+            "parents": [{"sha": parent, "url": f"{self._repo_url(repo)}/git/commits/{parent}"}
+                        for parent in commit["parents"]],
+        }
+
+    def _ref_json(self, repo, branch):
+        sha = repo.refs[branch]
+        return {
+            "ref": f"refs/heads/{branch}",
+            "url": f"{self._repo_url(repo)}/git/refs/heads/{branch}",
+            "object": {"sha": sha, "type": "commit", "url": f"{self._repo_url(repo)}/git/commits/{sha}"},
+        }
+
+    def _content_json(self, repo, path, sha):
+        size, stored = repo.blobs[sha]
+        return {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": sha,
+            "size": size,
+            "encoding": "base64",
+            "content": base64.b64encode(stored).decode("ascii") if stored is not None else "",
+            "url": f"{self._repo_url(repo)}/contents/{path}",
+        }
+
+    def _tree_json(self, repo, tree):
+        entries = [{"path": path, "mode": "100644", "type": "blob", "sha": sha, "size": repo.blobs[sha][0]}
+                   for path, sha in sorted(repo.files(tree).items())]
+        return {"sha": tree, "url": f"{self._repo_url(repo)}/git/trees/{tree}", "tree": entries, "truncated": False}
+
+    # Handlers ------------------------------------------------------------------------------------
+
+    def _find_repo(self, owner, name):
+        return self.repos.get(f"{owner}/{name}")
+
+    def _get_user(self, query, payload):
+        return 200, {"login": self.login, "type": "User", "url": f"{self.base_url}/user"}
+
+    def _get_rate_limit(self, query, payload):
+        with self._lock:
+            core = {"limit": self.rate_limit, "remaining": max(0, self.rate_limit - self._used),
+                    "reset": int(self._window_start + self.rate_window), "used": self._used}
+        return 200, {"resources": {"core": core}, "rate": core}
+
+    def _get_org(self, query, payload, org):
+        return 200, {"login": org, "type": "Organization", "url": f"{self.base_url}/orgs/{org}"}
+
+    def _list_repos(self, query, payload, org):
+        per_page = int(query.get("per_page", PER_PAGE))
+        page = int(query.get("page", 1))
+        with self._lock:
+            repos = [repo for repo in self.repos.values() if repo.owner == org]
+        items = [self._repo_json(repo) for repo in repos[(page - 1) * per_page:page * per_page]]
+        headers = {}
+        if page * per_page < len(repos):
+            headers["Link"] = f'<{self.base_url}/orgs/{org}/repos?per_page={per_page}&page={page + 1}>; rel="next"'
+        return 200, items, headers
+
+    def _create_repo(self, query, payload, owner):
+        name = payload.get("name")
+        if not name:
+            return 422, {"message": "Repository creation failed."}
+        with self._lock:
+            if self._find_repo(owner, name) is not None:
+                return 422, {"message": "Repository creation failed.",
+                             "errors": [{"message": "name already exists on this account"}]}
+            repo = MockRepo(owner, name, payload.get("description") or "", bool(payload.get("private")),
+                            bool(payload.get("auto_init")))
+            self.repos[repo.full_name] = repo
+            return 201, self._repo_json(repo)
+
+    def _get_repo(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        return 200, self._repo_json(repo)
+
+    def _get_contents(self, query, payload, owner, name, path):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or not repo.refs:
+                return 404, {"message": "Not Found"}
+            branch = query.get("ref", repo.default_branch)
+            if branch not in repo.refs:
+                return 404, {"message": f"No commit found for the ref {branch}"}
+            sha = repo.head_files(branch).get(path)
+            if sha is None:
+                return 404, {"message": "Not Found"}
+            return 200, self._content_json(repo, path, sha)
+
+    def _put_contents(self, query, payload, owner, name, path):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        try:
+            content = base64.b64decode(payload["content"])
+        except (KeyError, ValueError):
+            return 422, {"message": "Invalid request.\n\n\"content\" wasn't supplied."}
+        with self._lock:
+            branch = payload.get("branch") or repo.default_branch
+            if repo.refs and branch not in repo.refs:
+                return 404, {"message": f"Branch {branch} not found"}
+            expected_head = repo.refs.get(branch)
+        # The commit is written once the request's latency has passed, so overlapping commits race.
+        self._wait()
+        stored = content if self.store_contents else None
+        with self._lock:
+            head = repo.refs.get(branch)
+            if self.conflicts and head != expected_head:
+                return 409, {"message": f"{path} does not match {expected_head}"}
+            files = repo.head_files(branch) if head is not None else {}
+            current = files.get(path)
+            if current is not None and payload.get("sha") is None:
+                return 422, {"message": "Invalid request.\n\n\"sha\" wasn't supplied."}
+            if payload.get("sha") is not None and payload["sha"] != current:
+                return 409, {"message": f"{path} does not match {payload['sha']}"}
+            blob = repo.add_blob(content, stored)
+            base = repo.commits[head]["tree"] if head is not None else None
+            tree = repo.add_tree(base, {path: blob})
+            commit = repo.add_commit(payload.get("message", ""), tree, [head] if head is not None else [])
+            repo.refs[branch] = commit
+            files[path] = blob
+            repo.branch_files[branch] = files
+            status = 200 if current is not None else 201
+            return status, {"content": self._content_json(repo, path, blob), "commit": self._commit_json(repo, commit)}
+
+    def _create_blob(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        if payload.get("encoding") == "base64":
+            content = base64.b64decode(payload.get("content", ""))
+        else:
+            content = payload.get("content", "").encode("utf-8")
+        with self._lock:
+            sha = repo.add_blob(content, content if self.store_contents else None)
+        return 201, {"sha": sha, "url": f"{self._repo_url(repo)}/git/blobs/{sha}"}
+
+    def _resolve_tree(self, repo, ref):
+        # A tree SHA, a commit SHA or a branch name.
+        if ref in repo.trees:
+            return ref
+        if ref in repo.refs:
+            ref = repo.refs[ref]
+        if ref in repo.commits:
+            return repo.commits[ref]["tree"]
+        return None
+
+    def _get_tree(self, query, payload, owner, name, ref):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            tree = self._resolve_tree(repo, ref) if repo is not None else None
+            if tree is None:
+                return 404, {"message": "Not Found"}
+            return 200, self._tree_json(repo, tree)
+
+    def _create_tree(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        with self._lock:
+            base = payload.get("base_tree")
+            if base is not None and base not in repo.trees:
+                return 422, {"message": "Invalid tree info"}
+            changes = {}
+            for element in payload.get("tree", []):
+                if element.get("sha") not in repo.blobs:
+                    return 422, {"message": "Invalid tree info"}
+                changes[element["path"]] = element["sha"]
+            tree = repo.add_tree(base, changes)
+            return 201, self._tree_json(repo, tree)
+
+    def _get_commit(self, query, payload, owner, name, sha):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or sha not in repo.commits:
+                return 404, {"message": "Not Found"}
+            return 200, self._commit_json(repo, sha)
+
+    def _create_commit(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        with self._lock:
+            parents = payload.get("parents", [])
+            if payload.get("tree") not in repo.trees or any(parent not in repo.commits for parent in parents):
+                return 422, {"message": "Invalid commit info"}
+            commit = repo.add_commit(payload.get("message", ""), payload["tree"], parents)
+            return 201, self._commit_json(repo, commit)
+
+    def _get_ref(self, query, payload, owner, name, branch):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or branch not in repo.refs:
+                return 404, {"message": "Not Found"}
+            return 200, self._ref_json(repo, branch)
+
+    def _update_ref(self, query, payload, owner, name, branch):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or branch not in repo.refs:
+                return 404, {"message": "Not Found"}
+            sha = payload.get("sha")
+            if sha not in repo.commits:
+                return 422, {"message": "Object does not exist"}
+            if not payload.get("force") and repo.refs[branch] not in repo.ancestors(sha):
+                return 422, {"message": "Update is not a fast forward"}
+            repo.move_ref(branch, sha)
+            return 200, self._ref_json(repo, branch)
+
+    def _delete_ref(self, query, payload, owner, name, branch):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or branch not in repo.refs:
+                return 422, {"message": "Reference does not exist"}
+            del repo.refs[branch]
+            repo.branch_files.pop(branch, None)
+            return 204, None
+
+    def _create_ref(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        ref = payload.get("ref", "")
+        if not ref.startswith("refs/heads/"):
+            return 422, {"message": "Reference name must start with refs/heads/"}
+        branch = ref[len("refs/heads/"):]
+        with self._lock:
+            if branch in repo.refs:
+                return 422, {"message": "Reference already exists"}
+            if payload.get("sha") not in repo.commits:
+                return 422, {"message": "Object does not exist"}
+            repo.refs[branch] = payload["sha"]
+            return 201, self._ref_json(repo, branch)
+
+    def _get_branch(self, query, payload, owner, name, branch):
+        repo = self._find_repo(owner, name)
+        with self._lock:
+            if repo is None or branch not in repo.refs:
+                return 404, {"message": "Branch not found"}
+            sha = repo.refs[branch]
+            return 200, {"name": branch, "commit": {"sha": sha, "url": f"{self._repo_url(repo)}/commits/{sha}",
+                                                    "commit": self._commit_json(repo, sha)}}
+
+    def _merge(self, query, payload, owner, name):
+        repo = self._find_repo(owner, name)
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        with self._lock:
+            base_branch, head_branch = payload.get("base"), payload.get("head")
+            if base_branch not in repo.refs or head_branch not in repo.refs:
+                return 404, {"message": "Base or head does not exist"}
+            base, head = repo.refs[base_branch], repo.refs[head_branch]
+            if head in repo.ancestors(base):
+                return 204, None
+            ancestor = repo.merge_base(base, head)
+            ancestor_files = repo.files(repo.commits[ancestor]["tree"]) if ancestor is not None else {}
+            base_files = dict(repo.head_files(base_branch))
+            head_files = repo.files(repo.commits[head]["tree"])
+            changes = {}
+            for path, sha in head_files.items():
+                if sha == ancestor_files.get(path) or sha == base_files.get(path):
+                    continue
+                if base_files.get(path) != ancestor_files.get(path):
+                    return 409, {"message": "Merge conflict"}
+                changes[path] = sha
+            tree = repo.add_tree(repo.commits[base]["tree"], changes)
+            message = payload.get("commit_message") or f"Merge {head_branch} into {base_branch}"
+            commit = repo.add_commit(message, tree, [base, head])
+            repo.move_ref(base_branch, commit)
+            return 201, {"sha": commit, "url": f"{self._repo_url(repo)}/commits/{commit}",
+                         "commit": self._commit_json(repo, commit)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the GitHub REST API used by the junk data scripts.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds per request")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT, help="requests per rate-limit window")
+    parser.add_argument("--rate-window", type=int, default=DEFAULT_RATE_WINDOW, help="rate-limit window in seconds")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="requests in flight beyond which a secondary rate limit is hit")
+    parser.add_argument("--no-conflicts", action="store_true",
+                        help="accept overlapping commits to one branch instead of answering 409")
+    parser.add_argument("--store-contents", action="store_true", help="keep file contents (for get_contents)")
+    args = parser.parse_args()
+
+    mock = MockGitHub(args.host, args.port, args.latency, args.jitter, args.rate_limit, args.rate_window,
+                      args.max_concurrent, not args.no_conflicts, args.store_contents)
+    print(f"Mock GitHub API listening on {mock.base_url} (set API_BASE_URL={mock.base_url} in config.txt).")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {mock.requests} request(s), {mock.rejected} rejected by rate limits.")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
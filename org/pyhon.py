@@ -1,14 +1,21 @@
 import os
-import random
-import string
+import math
+import sys
+import asyncio
 import time
-import concurrent.futures
+import threading
 from github import Github, GithubException
 
-# Global constants for retry behavior.
-MAX_RETRIES = 3         # Maximum number of global retry rounds.
-RETRY_DELAY = 5         # Delay in seconds between each retry round.
-RATE_LIMIT_DELAY = 60   # Extra delay in seconds if a 403 Forbidden is encountered.
+# Code shared with repo/python.py lives in common/junkgen.py.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from junkgen import (
+    DEFAULT_FAILURES_SPILL_ROWS, DEFAULT_FILES_PER_COMMIT, DEFAULT_RATE_LIMIT_BURST, LOG, MAX_RETRIES, METRICS,
+    AdaptiveConcurrency, AsyncEngine, BatchCommitter, CommitLanes, FailureTable, RateLimiter, TaskScheduler,
+    build_tree_index, configure_log, content_seed, fast_import_files, gather_failures, get_client_options,
+    get_content_pipeline, get_engine, get_max_concurrency, get_metrics_exporter, get_push_url, get_upload_mode,
+    git_blob_sha, junk_content, prompt, read_int_setting, record_upload, report_failures, retry_delay,
+    upload_junk_file,
+)
 
 def read_config():
     """
@@ -19,11 +26,11 @@ def read_config():
     # Get the current folder where this script is located.
     script_dir = os.path.dirname(os.path.abspath(__file__))
     config_path = os.path.join(script_dir, "config.txt")
-    
+
     if not os.path.exists(config_path):
-        print(f"Config file '{config_path}' not found. Please create one with the required configurations.")
+        LOG.error(f"Config file '{config_path}' not found. Please create one with the required configurations.")
         exit(1)
-    
+
     config = {}
     with open(config_path, "r") as f:
         for line in f:
@@ -36,193 +43,614 @@ def read_config():
             config[key.strip()] = value.strip()
     return config
 
-def random_string_newlined(length):
+class TokenPool:
     """
-    Generates a random string of the specified length where each character is on its own line.
-    For example, if length is 3, a possible output is:
-      A
-      7
-      %
+    Several tokens (personal access tokens or GitHub App installation tokens), each with its own client,
+    organization object and RateLimiter budget, behind the same interface as a single RateLimiter.
+
+    reserve() is called by a worker right before it runs a task and picks the token with the most quota
+    left that is not throttled; refresh(), throttle(), charge(), org_for() and repo_for() then apply to
+    that token for the rest of the task, so consecutive requests spread over all tokens. Objects a task
+    keeps across tasks (such as the branch ref of a batch commit) are read again for each token.
     """
-    characters = string.ascii_letters + string.digits + string.punctuation
-    return "\n".join(random.choice(characters) for _ in range(length))
 
-def create_junk_file(repo, file_index, file_size, config):
+    def __init__(self, org_name, tokens, burst=DEFAULT_RATE_LIMIT_BURST, client_options=None):
+        self.entries = []
+        for token in tokens:
+            client = Github(token, per_page=100, **(client_options or {}))
+            self.entries.append({
+                "client": client,
+                "org": client.get_organization(org_name),
+                "limiter": RateLimiter(client, burst),
+                "repos": {},
+            })
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def throttles(self):
+        return sum(entry["limiter"].throttles for entry in self.entries)
+
+    def _current(self):
+        return getattr(self._local, "entry", self.entries[0])
+
+    def reserve(self):
+        """
+        Takes a token for one request from the token with the most remaining quota and makes it the
+        current token of the calling thread. Returns 0, or the seconds until some token has quota again.
+        """
+        wait = None
+        for entry in sorted(self.entries, key=lambda entry: entry["limiter"].remaining_quota(), reverse=True):
+            entry_wait = entry["limiter"].reserve()
+            if entry_wait <= 0:
+                self._local.entry = entry
+                return 0
+            wait = entry_wait if wait is None else min(wait, entry_wait)
+        return wait
+
+    def refresh(self):
+        self._current()["limiter"].refresh()
+
+    def throttle(self, headers=None):
+        return self._current()["limiter"].throttle(headers)
+
+    def charge(self, requests):
+        self._current()["limiter"].charge(requests)
+
+    def wait(self):
+        delay = self.reserve()
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.reserve()
+
+    def org_for(self, org):
+        """Returns the organization object of the current token."""
+        return self._current()["org"]
+
+    def repo_for(self, repo):
+        """
+        Returns repo as seen by the current token's client, fetching it once per token.
+        A repository created or read with the current token is returned as is.
+        """
+        entry = self._current()
+        with self._lock:
+            cached = entry["repos"].get(repo.full_name)
+        if cached is None:
+            cached = entry["client"].get_repo(repo.full_name)
+            with self._lock:
+                entry["repos"][repo.full_name] = cached
+        return cached
+
+    def adopt(self, repo):
+        """Records that repo was created or read with the current token."""
+        with self._lock:
+            self._current()["repos"][repo.full_name] = repo
+
+class RunJournal:
     """
-    Attempts to create (or update) a junk file in the given repository.
-    
-    - The file name is constructed from FILE_NAME_PREFIX and FILE_EXTENSION settings.
-    - The content is a randomly generated string with each character on its own line.
-    
-    If the file already exists (i.e. error status 409), the function retrieves the file’s current
-    SHA and attempts an update. If a 403 Forbidden error is encountered, a longer delay is applied 
-    before returning for a retry.
-    
-    Returns True on success; otherwise, returns a tuple (repo, file_index, file_size) for retry.
+    Append-only log of a run, used by --resume to schedule only the work that is left.
+
+    The first line records the plan ("plan <num_repos> <num_files> <file_size>"); after that one line
+    is appended per repository ("repo <name>") and per file ("file <repo name> <index>") as soon as
+    it is done. Every line is flushed when written, so a crash, Ctrl-C or an expired token loses at
+    most the line being written.
     """
-    file_prefix = config.get("FILE_NAME_PREFIX", "junk-")
-    file_ext = config.get("FILE_EXTENSION", "txt")
-    file_name = f"{file_prefix}{file_index}.{file_ext}"
-    content = random_string_newlined(file_size)
-    commit_message = f"Add/Update file {file_name} with junk content"
-    
-    try:
-        repo.create_file(path=file_name, message=commit_message, content=content)
-        print(f"  • Created file '{file_name}' in repository '{repo.name}'")
-        return True
-    except GithubException as e:
-        if e.status == 409:
-            # File conflict: file exists. Try to update.
+
+    def __init__(self, path):
+        self.path = path
+        self.plan = None
+        self.repos = set()
+        self.files = {}
+        self.resumed = False
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """
+        Reads an existing journal. Returns False if there is none (or it has no plan).
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # A line cut short by a crash (see _drop_partial_line()).
+                fields = line.split()
+                try:
+                    if fields[0] == "plan" and len(fields) == 4:
+                        self.plan = tuple(int(field) for field in fields[1:])
+                    elif fields[0] == "repo" and len(fields) == 2:
+                        self.repos.add(fields[1])
+                    elif fields[0] == "file" and len(fields) == 3:
+                        self.files.setdefault(fields[1], set()).add(int(fields[2]))
+                except (IndexError, ValueError):
+                    continue
+        return self.plan is not None
+
+    def start(self, num_repos, num_files, file_size, resume=False):
+        """
+        Opens the journal for appending. A new run truncates it and records the plan first.
+        """
+        self.resumed = resume
+        if resume:
+            self._drop_partial_line()
+            self._file = open(self.path, "a")
+        else:
+            self.plan = (num_repos, num_files, file_size)
+            self.repos.clear()
+            self.files.clear()
+            self._file = open(self.path, "w")
+            self._write(f"plan {num_repos} {num_files} {file_size}\n")
+
+    def _drop_partial_line(self):
+        # A line cut short by a crash may still parse ("file r 1" of "file r 12"), so it is cut off
+        # rather than ended, and the first line of the resumed run starts on a line of its own.
+        with open(self.path, "rb+") as f:
+            keep = f.seek(0, os.SEEK_END)
+            while keep > 0:
+                f.seek(keep - 1)
+                if f.read(1) == b"\n":
+                    break
+                keep -= 1
+            f.truncate(keep)
+
+    def _write(self, text):
+        with self._lock:
+            self._file.write(text)
+            self._file.flush()
+
+    def record_repo(self, repo_name):
+        self._write(f"repo {repo_name}\n")
+
+    def record_files(self, repo_name, file_indexes):
+        self._write("".join(f"file {repo_name} {i}\n" for i in file_indexes))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+def get_tokens(config):
+    """
+    Returns the tokens of the run: GITHUB_TOKEN followed by the comma-separated GITHUB_TOKENS, if set.
+    """
+    tokens = [config.get("GITHUB_TOKEN", "")] + config.get("GITHUB_TOKENS", "").split(",")
+    unique = []
+    for token in (token.strip() for token in tokens):
+        if token and token not in unique:
+            unique.append(token)
+    return unique
+
+async def run_org_async(token, org_name, num_repos, num_files, file_size, config, concurrency, rate_limiter,
+                        failed_files, journal=None, pipeline=None, failed_repos=None):
+    """
+    ENGINE=async version of the repository/file work in main(): every repository and file is handled
+    on one event loop, and each failed repository creation or file is retried up to MAX_RETRIES times with
+    backoff. Files are spread over BRANCH_LANES branches as in schedule_files(). With a journal, work it
+    records as done is skipped and completed work is recorded, as in process_repo().
+    File tasks that still failed are added to failed_files (see FailureTable), and repositories that
+    could not be created to failed_repos, if given.
+    """
+    repo_name_prefix = config.get("REPO_NAME_PREFIX", "junk-repo-")
+    num_lanes = read_int_setting(config, "BRANCH_LANES", 1)
+    async with AsyncEngine(token, config, concurrency, rate_limiter, pipeline) as engine:
+        async def upload(full_name, file_index, file_size, tree_index, branches, written):
+            repo_name = full_name.split("/")[-1]
+            branch = branches[file_index % len(branches)]
+            result = await engine.upload_junk_file(full_name, file_index, file_size, tree_index, branch)
+            if result is not True:
+                failed_files.add(repo_name, file_index, file_size, MAX_RETRIES + 1, result)
+            elif branch != branches[0]:
+                # Files written to a lane branch are journaled once it is merged, as with CommitLanes.
+                written.setdefault(branch, []).append(file_index)
+            elif journal is not None:
+                journal.record_files(repo_name, [file_index])
+            # Failures are kept in failed_files, so there is nothing to collect.
+            return True
+        
+        async def process(repo_index):
+            repo_name = f"{repo_name_prefix}{repo_index}"
+            # Errors are logged and end this repository only, as in process_repo().
             try:
-                current_content = repo.get_contents(file_name)
-                repo.update_file(path=file_name, message=commit_message, content=content, sha=current_content.sha)
-                print(f"  • Updated file '{file_name}' in repository '{repo.name}'")
+                resuming = journal is not None and repo_name in journal.repos
+                if not resuming:
+                    for attempt in range(MAX_RETRIES + 1):
+                        if attempt:
+                            METRICS.inc("junk_retries_total", task="create_repo")
+                            await asyncio.sleep(retry_delay(attempt))
+                        try:
+                            status, data = await engine.create_repo(f"/orgs/{org_name}", repo_name)
+                        except Exception as err:
+                            status, data = 0, str(err)
+                        # On resume, a repository created by the interrupted run before it was journaled is reused.
+                        resuming = status == 422 and journal is not None and journal.resumed
+                        if status == 201 or resuming:
+                            break
+                        message = data.get("message") if isinstance(data, dict) else data
+                        LOG.error(f"Error creating repository '{repo_name}': {status} {message}", repo=repo_name)
+                    else:
+                        if failed_repos is not None:
+                            failed_repos.append(repo_name)
+                        return False
+                if resuming:
+                    status, _, data = await engine.request("GET", f"/repos/{org_name}/{repo_name}")
+                    if status != 200:
+                        LOG.error(f"Error resuming repository '{repo_name}': {status}", repo=repo_name)
+                        return False
+                    LOG.info(f"Resuming repository: {repo_name}", repo=repo_name)
+                    tree_index = await engine.get_tree_index(data["full_name"], data["default_branch"])
+                else:
+                    LOG.info(f"Created repository: {repo_name}", repo=repo_name)
+                    tree_index = {}
+                if journal is not None and repo_name not in journal.repos:
+                    journal.record_repo(repo_name)
+                done = journal.files.get(repo_name, ()) if journal is not None else ()
+                branches = await engine.open_lanes(data["full_name"], data["default_branch"], num_lanes)
+                written = {}
+                await gather_failures((upload(data["full_name"], i, file_size, tree_index, branches, written)
+                                       for i in range(1, num_files + 1) if i not in done),
+                                      2 * concurrency, file_slots)
+                for branch in await engine.merge_lanes(data["full_name"], branches, written, failed_files, file_size):
+                    if journal is not None:
+                        journal.record_files(repo_name, written.get(branch, []))
                 return True
-            except GithubException as update_err:
-                print(f"  • Error updating file '{file_name}' in repository '{repo.name}': {update_err}")
-                return (repo, file_index, file_size)
-        elif e.status == 403:
-            # 403 Forbidden: Likely due to rate limiting or insufficient permissions.
-            print(f"  • 403 Forbidden error for file '{file_name}' in repository '{repo.name}': {e}")
-            print(f"    Waiting for {RATE_LIMIT_DELAY} seconds before retrying.")
-            time.sleep(RATE_LIMIT_DELAY)
-            return (repo, file_index, file_size)
-        else:
-            print(f"  • Error creating file '{file_name}' in repository '{repo.name}': {e}")
-            return (repo, file_index, file_size)
-    except Exception as err:
-        err_str = str(err)
-        if "403" in err_str:
-            print(f"  • 403 Forbidden error for file '{file_name}' in repository '{repo.name}': {err}")
-            print(f"    Waiting for {RATE_LIMIT_DELAY} seconds before retrying.")
-            time.sleep(RATE_LIMIT_DELAY)
-            return (repo, file_index, file_size)
-        else:
-            print(f"  • Error creating file '{file_name}' in repository '{repo.name}': {err}")
-            return (repo, file_index, file_size)
+            except Exception as err:
+                LOG.error(f"Error processing repository '{repo_name}': {err}", repo=repo_name)
+                return False
+        
+        # The file coroutines of all repositories share one window, however many repositories are in progress.
+        file_slots = asyncio.Semaphore(2 * concurrency)
+        await gather_failures((process(i) for i in range(1, num_repos + 1)), concurrency)
 
-def process_repo(repo_index, num_files, file_size, org, config, slow_mode):
+def create_repo(org, repo_name, config):
+    """
+    Creates a repository in the organization with the description and privacy setting from config.
+    """
+    return org.create_repo(
+        name=repo_name,
+        auto_init=True,
+        description=config.get("REPO_DESCRIPTION", "Repository filled with junk content"),
+        private=config.get("PRIVATE_REPO", "False").strip().lower() == "true"
+    )
+
+def process_repo(repo_index, num_files, file_size, org, config, scheduler, failed_files, journal=None,
+                 pipeline=None, failed_repos=None, attempt=0):
     """
     Creates a repository (with a name, description, and privacy setting from config)
-    and concurrently creates junk files within it.
-    
-    Returns a list of failed file creation tasks (tuples) that will be retried later.
+    and schedules the creation of its junk files on the shared scheduler.
+
+    A failed repository creation is put back on the scheduler after a backoff delay (see retry_delay())
+    until it has been retried MAX_RETRIES times; after that the name is added to failed_repos, if given.
+    File creation tasks that still fail after their retries are added to failed_files (see FailureTable).
+    With a journal (see RunJournal), repositories and files it records as done are not redone and
+    everything completed here is recorded. When resuming, existing repositories are reused.
     """
     repo_name_prefix = config.get("REPO_NAME_PREFIX", "junk-repo-")
     repo_name = f"{repo_name_prefix}{repo_index}"
-    repo_description = config.get("REPO_DESCRIPTION", "Repository filled with junk content")
-    private_repo = config.get("PRIVATE_REPO", "False").strip().lower() == "true"
-    
-    failed_files = []
+
+    token_org = scheduler.rate_limiter.org_for(org) if scheduler.rate_limiter is not None else org
+    resuming = journal is not None and repo_name in journal.repos
     try:
-        repo = org.create_repo(
-            name=repo_name,
-            auto_init=True,
-            description=repo_description,
-            private=private_repo
-        )
-        print(f"Created repository: {repo_name}")
-        
-        # For file creation, use fewer concurrent threads if in slow mode.
-        max_workers_files = 1 if slow_mode else num_files
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers_files) as file_executor:
-            futures = [
-                file_executor.submit(create_junk_file, repo, i, file_size, config)
-                for i in range(1, num_files + 1)
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result is not True:
-                    failed_files.append(result)
-                # If in slow mode, insert a brief delay between file tasks.
-                if slow_mode:
-                    time.sleep(1)
+        if not resuming:
+            try:
+                repo = create_repo(token_org, repo_name, config)
+                LOG.info(f"Created repository: {repo_name}", repo=repo_name)
+            except GithubException as err:
+                # On resume, a repository created by the interrupted run before it was journaled is reused.
+                if err.status != 422 or journal is None or not journal.resumed:
+                    raise
+                resuming = True
+        if resuming:
+            repo = token_org.get_repo(repo_name)
+            LOG.info(f"Resuming repository: {repo_name}", repo=repo_name)
     except Exception as err:
-        print(f"Error creating repository '{repo_name}': {err}")
-    
-    return failed_files
-
-def retry_failed_files(failed_tasks, config, slow_mode):
-    """
-    Sequentially retries file creation/update tasks for any files that failed.
-    Each element in failed_tasks is a tuple: (repo, file_index, file_size).
-    Returns a new list of tasks that still fail after the retry.
-    """
-    new_failures = []
-    for task in failed_tasks:
-        repo, file_index, file_size = task
-        if slow_mode:
-            time.sleep(1)
-        result = create_junk_file(repo, file_index, file_size, config)
-        if result is not True:
-            new_failures.append(result)
-    return new_failures
+        LOG.error(f"Error creating repository '{repo_name}': {err}", repo=repo_name)
+        if isinstance(err, GithubException) and err.status in (403, 429) and scheduler.rate_limiter is not None:
+            scheduler.rate_limiter.throttle(err.headers)
+        if attempt < MAX_RETRIES:
+            METRICS.inc("junk_retries_total", task="create_repo")
+            scheduler.submit(process_repo, repo_index, num_files, file_size, org, config, scheduler, failed_files,
+                             journal, pipeline, failed_repos, attempt + 1, delay=retry_delay(attempt + 1))
+        elif failed_repos is not None:
+            failed_repos.append(repo_name)
+        return
+    if scheduler.rate_limiter is not None:
+        scheduler.rate_limiter.adopt(repo)
+
+    done = set()
+    if journal is not None:
+        if repo_name not in journal.repos:
+            journal.record_repo(repo_name)
+        done = journal.files.get(repo_name, done)
+    file_indexes = [i for i in range(1, num_files + 1) if i not in done] if done else range(1, num_files + 1)
+    # A repository that was just created holds none of the junk files yet, so its index starts empty.
+    tree_index = build_tree_index(repo) if resuming and get_upload_mode(config) == "contents" else {}
+    schedule_files(repo, file_indexes, file_size, token_org, config, scheduler, failed_files, journal, tree_index,
+                   pipeline)
+
+def schedule_files(repo, file_indexes, file_size, org, config, scheduler, failed_files, journal=None,
+                   tree_index=None, pipeline=None):
+    """
+    Schedules the upload of the given junk files of a repository with the configured UPLOAD_MODE.
+    tree_index (see build_tree_index()) records the SHA of every file written, so that retries can
+    update it directly. With a pipeline (see ContentPipeline), the contents of the files in the
+    scheduler's window are generated in its worker processes.
+    """
+    # File uploads share the same bounded worker pool as repository creation.
+    upload_mode = get_upload_mode(config)
+    if upload_mode == "batch":
+        BatchCommitter(repo, file_indexes, file_size, config, scheduler, failed_files, journal).start()
+        return
+    if upload_mode == "fastimport":
+        push_junk_files(repo, file_indexes, file_size, org, config, scheduler, failed_files, journal)
+        return
+    if tree_index is None:
+        tree_index = {}
+    if not file_indexes:
+        return
+    # Commits to one branch go through its lane one at a time; see CommitLanes.
+    lanes = CommitLanes(repo, read_int_setting(config, "BRANCH_LANES", 1), len(file_indexes), journal,
+                        scheduler.rate_limiter, failed_files, file_size)
+    lanes.open()
+    seed = content_seed(config)
+
+    def tasks():
+        for i in file_indexes:
+            # Drawn lazily, so only the files in the scheduler's window have content being generated.
+            content = pipeline.content(seed, repo.name, i, file_size) if pipeline is not None else None
+            yield (upload_junk_file,
+                   (repo, i, file_size, config, scheduler, failed_files, tree_index, journal, 0, lanes, content),
+                   lanes.lane_for(i))
+
+    scheduler.submit_each(tasks())
+
+def push_junk_files(repo, file_indexes, file_size, org, config, scheduler, failed_files, journal=None, attempt=0):
+    """
+    Scheduler task running fast_import_files() for a repository. A failed push is retried like a failed
+    file (see upload_junk_file()); if it keeps failing, all of its files are added to failed_files.
+    """
+    push_url = get_push_url(config, org.login, repo.name)
+    if fast_import_files(push_url, repo.default_branch, file_indexes, file_size, config, repo.name):
+        LOG.info(f"  • Pushed {len(file_indexes)} junk file(s) to repository '{repo.name}'", repo=repo.name)
+        record_upload(len(file_indexes), len(file_indexes) * max(0, 2 * file_size - 1))
+        if journal is not None:
+            journal.record_files(repo.name, file_indexes)
+    elif attempt < MAX_RETRIES:
+        METRICS.inc("junk_retries_total", task="push_junk_files")
+        scheduler.submit(push_junk_files, repo, file_indexes, file_size, org, config, scheduler, failed_files,
+                         journal, attempt + 1, delay=retry_delay(attempt + 1))
+    else:
+        for i in file_indexes:
+            failed_files.add(repo.name, i, file_size, attempt + 1)
+
+def plan_repo(repo, file_size, num_files, config, plan, rate_limiter=None):
+    """
+    Scheduler task of plan_org(): reads the tree of an existing repository and adds it to the plan
+    with the files that are missing or differ from what the run would write (by size, and by SHA when
+    CONTENT_SEED is set). With a rate_limiter, the tree is read with the token it reserved for the task.
+    """
+    sizes = {}
+    tree_index = build_tree_index(rate_limiter.repo_for(repo) if rate_limiter is not None else repo, sizes)
+    expected_size = max(0, 2 * file_size - 1)
+    seeded = bool(config.get("CONTENT_SEED"))
+    file_prefix = config.get("FILE_NAME_PREFIX", "junk-")
+    file_ext = config.get("FILE_EXTENSION", "txt")
+    file_indexes = []
+    for i in range(1, num_files + 1):
+        file_name = f"{file_prefix}{i}.{file_ext}"
+        if sizes.get(file_name) != expected_size:
+            file_indexes.append(i)
+        elif seeded:
+            content = junk_content(config, repo.name, i, file_size)
+            if tree_index[file_name] != git_blob_sha(content):
+                file_indexes.append(i)
+    if file_indexes:
+        plan[repo.name] = (repo, tree_index, file_indexes)
+
+def plan_org(org, num_repos, num_files, file_size, config, scheduler):
+    """
+    Compares the repositories and files the run asks for with what the organization already has.
+
+    The organization's repositories are listed once (100 per page) and the tree of every existing
+    target repository is read once, concurrently on the scheduler. Returns a dict mapping the name of
+    each repository that needs work to (repo, tree_index, file_indexes); repo is None for repositories
+    that do not exist yet.
+    """
+    repo_name_prefix = config.get("REPO_NAME_PREFIX", "junk-repo-")
+    existing = {repo.name: repo for repo in org.get_repos() if repo.name.startswith(repo_name_prefix)}
+    plan = {}
+    for i in range(1, num_repos + 1):
+        repo_name = f"{repo_name_prefix}{i}"
+        if repo_name in existing:
+            scheduler.submit(plan_repo, existing[repo_name], file_size, num_files, config, plan, scheduler.rate_limiter)
+        else:
+            plan[repo_name] = (None, {}, list(range(1, num_files + 1)))
+    scheduler.join()
+    return plan
+
+def estimate_api_calls(plan, config):
+    """
+    Returns the approximate number of API requests needed to carry out a plan from plan_org()
+    with the configured UPLOAD_MODE (git pushes of fastimport mode are not API requests).
+    """
+    calls = sum(1 for repo, _, _ in plan.values() if repo is None)
+    upload_mode = get_upload_mode(config)
+    for _, _, file_indexes in plan.values():
+        if upload_mode == "contents":
+            calls += len(file_indexes)
+            num_lanes = read_int_setting(config, "BRANCH_LANES", 1)
+            if file_indexes and num_lanes > 1:
+                # Reading the branch head, then creating, merging and deleting every lane branch.
+                calls += 1 + 3 * (num_lanes - 1)
+        elif upload_mode == "batch":
+            files_per_commit = read_int_setting(config, "FILES_PER_COMMIT", DEFAULT_FILES_PER_COMMIT)
+            # One blob per file, a tree, a commit and a ref update per batch, plus reading the branch head.
+            calls += len(file_indexes) + 3 * math.ceil(len(file_indexes) / files_per_commit) + 2
+    return calls
+
+def apply_repo_plan(repo_name, planned, file_size, org, config, scheduler, failed_files, journal=None,
+                    pipeline=None, failed_repos=None, attempt=0):
+    """
+    Scheduler task carrying out one repository of a plan from plan_org(): creates the repository if
+    needed, retrying like process_repo(), and schedules only the planned files.
+    """
+    repo, tree_index, file_indexes = planned
+    if repo is None:
+        rate_limiter = scheduler.rate_limiter
+        try:
+            repo = create_repo(rate_limiter.org_for(org) if rate_limiter is not None else org, repo_name, config)
+            LOG.info(f"Created repository: {repo_name}", repo=repo_name)
+        except Exception as err:
+            LOG.error(f"Error creating repository '{repo_name}': {err}", repo=repo_name)
+            if isinstance(err, GithubException) and err.status in (403, 429) and rate_limiter is not None:
+                rate_limiter.throttle(err.headers)
+            if attempt < MAX_RETRIES:
+                METRICS.inc("junk_retries_total", task="create_repo")
+                scheduler.submit(apply_repo_plan, repo_name, planned, file_size, org, config, scheduler, failed_files,
+                                 journal, pipeline, failed_repos, attempt + 1, delay=retry_delay(attempt + 1))
+            elif failed_repos is not None:
+                failed_repos.append(repo_name)
+            return
+        if rate_limiter is not None:
+            rate_limiter.adopt(repo)
+    if journal is not None:
+        journal.record_repo(repo_name)
+    schedule_files(repo, file_indexes, file_size, org, config, scheduler, failed_files, journal, tree_index, pipeline)
+
+def run(github_client, token, org, config, slow_mode, num_repos, num_files, file_size, journal, plan_first=False,
+        adaptive=False, resume=False):
+    """
+    Creates the repositories and junk files of the plan with the configured engine, then retries
+    failed files. Progress is recorded in the journal, which is started (see RunJournal.start()) only
+    once the work begins, so a plan that is not applied leaves the journal of an earlier run intact.
+
+    With plan_first, the existing repositories and files are compared with the plan first (see
+    plan_org()), the work left and its API-call estimate are printed, and after confirmation only
+    that work is carried out. With adaptive, the concurrency is tuned by AdaptiveConcurrency, which
+    only the threads engine has.
+    """
+    burst = read_int_setting(config, "RATE_LIMIT_BURST", DEFAULT_RATE_LIMIT_BURST)
+    global_failed_files = FailureTable(read_int_setting(config, "FAILURES_SPILL_ROWS", DEFAULT_FAILURES_SPILL_ROWS),
+                                       config.get("FAILURES_SPILL_DIR") or None)
+    # Repositories that could not be created after their retries.
+    failed_repos = []
+    if get_engine(config) == "async" and plan_first:
+        LOG.info("Plan mode runs on the threads engine.")
+    elif get_engine(config) == "async" and adaptive:
+        LOG.warning("ADAPTIVE mode runs on the threads engine; ENGINE=async is ignored.")
+    elif get_engine(config) == "async":
+        journal.start(num_repos, num_files, file_size, resume)
+        pipeline = get_content_pipeline(config)
+        asyncio.run(run_org_async(token, org.login, num_repos, num_files, file_size, config,
+                                  get_max_concurrency(config, slow_mode), RateLimiter(burst=burst),
+                                  global_failed_files, journal, pipeline, failed_repos))
+        if pipeline is not None:
+            pipeline.close()
+        report_failures(global_failed_files, failed_repos)
+        global_failed_files.close()
+        return
+
+    # One bounded scheduler is shared by repository creation and file uploads.
+    tokens = get_tokens(config)
+    if len(tokens) > 1:
+        LOG.info(f"Spreading requests over {len(tokens)} tokens.")
+        rate_limiter = TokenPool(org.login, tokens, burst=burst, client_options=get_client_options(config))
+    else:
+        rate_limiter = RateLimiter(github_client, burst=burst)
+    max_workers = get_max_concurrency(config, slow_mode)
+    controller = AdaptiveConcurrency(max_workers) if adaptive else None
+    scheduler = TaskScheduler(max_workers, task_delay=1 if slow_mode else 0, rate_limiter=rate_limiter,
+                              controller=controller)
+    if plan_first:
+        LOG.info("Comparing the organization's repositories with the plan...")
+        plan = plan_org(org, num_repos, num_files, file_size, config, scheduler)
+        new_repos = sum(1 for repo, _, _ in plan.values() if repo is None)
+        num_changes = sum(len(file_indexes) for _, _, file_indexes in plan.values())
+        LOG.info(f"Plan: create {new_repos} repositories and write {num_changes} files in {len(plan)} repositories "
+                 f"(about {estimate_api_calls(plan, config)} API calls).")
+        if not plan:
+            LOG.info("Nothing to do.")
+            return
+        if prompt("Apply this plan? [y/N]: ").strip().lower() != "y":
+            LOG.info("Plan not applied.")
+            return
+    journal.start(num_repos, num_files, file_size, resume)
+    # Contents are generated in worker processes, if GENERATOR_PROCESSES is set, while the threads upload.
+    pipeline = get_content_pipeline(config)
+    if plan_first:
+        scheduler.submit_each((apply_repo_plan, (repo_name, planned, file_size, org, config, scheduler,
+                                                 global_failed_files, journal, pipeline, failed_repos), None)
+                              for repo_name, planned in plan.items())
+    else:
+        # Repository tasks (and, per repository, file tasks) are drawn lazily through a bounded window.
+        scheduler.submit_each((process_repo, (i, num_files, file_size, org, config, scheduler, global_failed_files,
+                                              journal, pipeline, failed_repos), None)
+                              for i in range(1, num_repos + 1))
+    scheduler.join()
+    if pipeline is not None:
+        pipeline.close()
+
+    report_failures(global_failed_files, failed_repos)
+    global_failed_files.close()
 
 def main():
     # Read configuration (config.txt must be in the same folder as this script).
     config = read_config()
+    configure_log(config)
     token = config.get("GITHUB_TOKEN")
     org_name = config.get("ORG_NAME")
     if not token or not org_name:
-        print("Error: 'GITHUB_TOKEN' and 'ORG_NAME' must be set in config.txt")
+        LOG.error("Error: 'GITHUB_TOKEN' and 'ORG_NAME' must be set in config.txt")
         exit(1)
-    
+    # Counters and histograms of the run, on a local endpoint and/or in a textfile if configured.
+    exporter = get_metrics_exporter(config)
+
     try:
-        github_client = Github(token)
+        # List endpoints (used by plan mode) are read at the maximum page size.
+        github_client = Github(token, per_page=100, **get_client_options(config))
         org = github_client.get_organization(org_name)
     except Exception as e:
-        print(f"Error connecting to organization '{org_name}': {e}")
+        LOG.error(f"Error connecting to organization '{org_name}': {e}")
         exit(1)
-    
+
     # Ask the user for mode selection.
-    mode_input = input("Choose execution speed - Enter F for SUPER FAST or S for SLOW: ").strip().lower()
+    mode_input = prompt("Choose execution speed - Enter F for SUPER FAST, A for ADAPTIVE or S for SLOW: ").strip().lower()
     slow_mode = True if mode_input == "s" else False
+    adaptive = mode_input == "a"
     if slow_mode:
-        print("Running in SLOW mode. Concurrency is reduced and delays are added to avoid rate limiting.")
+        LOG.info("Running in SLOW mode. Concurrency is reduced and delays are added to avoid rate limiting.")
+    elif adaptive:
+        LOG.info(f"Running in ADAPTIVE mode. Concurrency is tuned automatically up to {get_max_concurrency(config, slow_mode)}.")
     else:
-        print("Running in SUPER FAST mode. This will use maximum concurrency (use with caution).")
-    
-    try:
-        num_repos = int(input("Enter the number of repositories to create: "))
-        num_files = int(input("Enter the number of junk files per repository: "))
-        file_size = int(input("Enter the number of characters (each on its own line) per junk file: "))
-    except ValueError:
-        print("Invalid input. Please enter valid integer values.")
-        exit(1)
-    
-    global_failed_files = []
-    # Use a reduced number of threads for repository creation when in slow mode.
-    max_workers_repos = 1 if slow_mode else num_repos
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers_repos) as repo_executor:
-        repo_futures = [
-            repo_executor.submit(process_repo, i, num_files, file_size, org, config, slow_mode)
-            for i in range(1, num_repos + 1)
-        ]
-        for future in concurrent.futures.as_completed(repo_futures):
-            try:
-                failed_files = future.result()
-                if failed_files:
-                    global_failed_files.extend(failed_files)
-            except Exception as e:
-                print(f"An error occurred during repository processing: {e}")
-    
-    # Global retry for failed file tasks.
-    if global_failed_files:
-        print(f"\nRetrying {len(global_failed_files)} failed file creation/update task(s) after a delay of {RETRY_DELAY} seconds...")
-        time.sleep(RETRY_DELAY)
-        for attempt in range(MAX_RETRIES):
-            print(f"\nRetry attempt {attempt + 1}:")
-            global_failed_files = retry_failed_files(global_failed_files, config, slow_mode)
-            if not global_failed_files:
-                print("All previously failed file tasks have succeeded on retry.")
-                break
-            else:
-                print(f"{len(global_failed_files)} file(s) still failed.")
-                time.sleep(RETRY_DELAY)
-        if global_failed_files:
-            print(f"\nAfter {MAX_RETRIES} retry attempts, {len(global_failed_files)} file(s) still failed to be created/updated.")
+        LOG.info(f"Running in SUPER FAST mode with up to {get_max_concurrency(config, slow_mode)} concurrent tasks.")
+
+    # With --resume, the plan comes from the journal of the interrupted run instead of the prompts.
+    resume = "--resume" in sys.argv[1:]
+    plan_first = "--plan" in sys.argv[1:]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    journal = RunJournal(config.get("JOURNAL_FILE") or os.path.join(script_dir, "journal.log"))
+    if resume:
+        if not journal.load():
+            LOG.warning(f"No journal to resume found at '{journal.path}'.")
+            exit(1)
+        num_repos, num_files, file_size = journal.plan
+        done_files = sum(len(indexes) for indexes in journal.files.values())
+        LOG.info(f"Resuming a run of {num_repos} repositories with {num_files} files of {file_size} characters each: "
+                 f"{len(journal.repos)} repositories and {done_files} files are already done.")
     else:
-        print("\nAll files created/updated successfully on the first pass.")
+        try:
+            num_repos = int(prompt("Enter the number of repositories to create: "))
+            num_files = int(prompt("Enter the number of junk files per repository: "))
+            file_size = int(prompt("Enter the number of characters (each on its own line) per junk file: "))
+        except ValueError:
+            LOG.error("Invalid input. Please enter valid integer values.")
+            exit(1)
+    try:
+        run(github_client, token, org, config, slow_mode, num_repos, num_files, file_size, journal, plan_first,
+            adaptive, resume)
+    finally:
+        journal.close()
+        if exporter is not None:
+            exporter.close()
 
 if __name__ == "__main__":
     main()
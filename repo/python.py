@@ -1,10 +1,18 @@
 import os
-import random
-import string
-import time
-import concurrent.futures
+import sys
+import asyncio
 from github import Github, GithubException
 
+# Code shared with org/pyhon.py lives in common/junkgen.py.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from junkgen import (
+    DEFAULT_FAILURES_SPILL_ROWS, DEFAULT_RATE_LIMIT_BURST, LOG, MAX_RETRIES, AdaptiveConcurrency, AsyncEngine,
+    BatchCommitter, CommitLanes, FailureTable, RateLimiter, TaskScheduler, build_tree_index, configure_log,
+    content_seed, fast_import_files, gather_failures, get_client_options, get_content_pipeline, get_engine,
+    get_max_concurrency, get_metrics_exporter, get_push_url, get_upload_mode, prompt, read_int_setting,
+    record_upload, report_failures, upload_junk_file,
+)
+
 def read_config():
     """
     Reads configuration values from a file named 'config.txt' located in the same folder as this script.
@@ -14,7 +22,7 @@ def read_config():
     config_path = os.path.join(script_dir, "config.txt")
     
     if not os.path.exists(config_path):
-        print(f"Config file '{config_path}' not found. Please ensure it is in the same folder as this script.")
+        LOG.error(f"Config file '{config_path}' not found. Please ensure it is in the same folder as this script.")
         exit(1)
     
     config = {}
@@ -29,86 +37,59 @@ def read_config():
             config[key.strip()] = value.strip()
     return config
 
-def random_string_newlined(length):
+async def run_repo_async(token, full_name, branch, num_files, file_size, config, concurrency, rate_limiter,
+                         failed_files, pipeline=None):
     """
-    Generates a random string of the specified length where each character appears on its own line.
-    
-    For example, if length is 3 a possible output is:
-      A
-      7
-      %
+    ENGINE=async version of the file uploads in main(): the tree index of the branch is fetched once,
+    then every file is handled on one event loop, spread over BRANCH_LANES branches, and retried up to
+    MAX_RETRIES times with backoff. Files that still failed are added to failed_files (see FailureTable).
     """
-    characters = string.ascii_letters + string.digits + string.punctuation
-    return "\n".join(random.choice(characters) for _ in range(length))
+    repo_name = full_name.split("/")[-1]
+    async with AsyncEngine(token, config, concurrency, rate_limiter, pipeline) as engine:
+        tree_index = await engine.get_tree_index(full_name, branch)
+        branches = await engine.open_lanes(full_name, branch, read_int_setting(config, "BRANCH_LANES", 1))
 
-def create_junk_file(repo, file_index, file_size, config):
-    """
-    Attempts to create (or update) a junk file in the specified repository.
-    
-    - The file name is constructed using FILE_NAME_PREFIX and FILE_EXTENSION from the config.
-    - The junk file's content is a random string with each character on its own line.
-    
-    If the file already exists (error 409), the script retrieves the current SHA and updates the file.
-    If a 403 error is encountered, a delay is applied before retrying the update.
-    """
-    file_prefix = config.get("FILE_NAME_PREFIX", "junk-")
-    file_ext = config.get("FILE_EXTENSION", "txt")
-    file_name = f"{file_prefix}{file_index}.{file_ext}"
-    content = random_string_newlined(file_size)
-    commit_message = f"Add/Update file {file_name} with junk content"
-    
-    try:
-        repo.create_file(path=file_name, message=commit_message, content=content)
-        print(f"Created file '{file_name}' in repository '{repo.name}'.")
-    except GithubException as e:
-        if e.status == 409:
-            # File already exists; attempt update.
-            try:
-                current_content = repo.get_contents(file_name)
-                repo.update_file(path=file_name, message=commit_message,
-                                 content=content, sha=current_content.sha)
-                print(f"Updated file '{file_name}' in repository '{repo.name}'.")
-            except GithubException as update_err:
-                print(f"Error updating file '{file_name}' in repository '{repo.name}': {update_err}")
-        elif e.status == 403:
-            # 403 Forbidden: likely due to rate limiting or permission issues.
-            print(f"403 Forbidden error for file '{file_name}' in repository '{repo.name}': {e}")
-            print("Waiting 60 seconds before retrying the update.")
-            time.sleep(60)
-            try:
-                current_content = repo.get_contents(file_name)
-                repo.update_file(path=file_name, message=commit_message,
-                                 content=content, sha=current_content.sha)
-                print(f"Updated file '{file_name}' after delay in repository '{repo.name}'.")
-            except GithubException as update_err:
-                print(f"Error updating file '{file_name}' after delay in repository '{repo.name}': {update_err}")
-        else:
-            print(f"Error creating file '{file_name}' in repository '{repo.name}': {e}")
+        written = {}
+
+        async def upload(file_index):
+            branch = branches[file_index % len(branches)]
+            result = await engine.upload_junk_file(full_name, file_index, file_size, tree_index, branch)
+            if result is not True:
+                failed_files.add(repo_name, file_index, file_size, MAX_RETRIES + 1, result)
+            elif branch != branches[0]:
+                written.setdefault(branch, []).append(file_index)
+            return True
+
+        await gather_failures((upload(i) for i in range(1, num_files + 1)), 2 * concurrency)
+        await engine.merge_lanes(full_name, branches, written, failed_files, file_size)
 
 def main():
     # Read configuration from config.txt (which must be in the same folder as this script).
     config = read_config()
+    configure_log(config)
     token = config.get("GITHUB_TOKEN")
     repo_name = config.get("REPO_NAME")
     
     if not token or not repo_name:
-        print("Error: GITHUB_TOKEN and REPO_NAME must be set in config.txt")
+        LOG.error("Error: GITHUB_TOKEN and REPO_NAME must be set in config.txt")
         exit(1)
+    # Counters and histograms of the run, on a local endpoint and/or in a textfile if configured.
+    exporter = get_metrics_exporter(config)
     
     # Connect to GitHub using your token.
     try:
-        github_client = Github(token)
+        github_client = Github(token, **get_client_options(config))
         user = github_client.get_user()
     except Exception as e:
-        print(f"Error connecting to GitHub: {e}")
+        LOG.error(f"Error connecting to GitHub: {e}")
         exit(1)
     
     # Try to retrieve the repository; if it doesn't exist, create it.
     try:
         repo = user.get_repo(repo_name)
-        print(f"Repository '{repo_name}' found on your user account.")
+        LOG.info(f"Repository '{repo_name}' found on your user account.", repo=repo_name)
     except GithubException as e:
-        print(f"Repository '{repo_name}' not found. Attempting to create it.")
+        LOG.info(f"Repository '{repo_name}' not found. Attempting to create it.", repo=repo_name)
         try:
             repo = user.create_repo(
                 name=repo_name,
@@ -116,42 +97,90 @@ def main():
                 private=config.get("PRIVATE_REPO", "False").strip().lower() == "true",
                 auto_init=True
             )
-            print(f"Created repository '{repo_name}'.")
+            LOG.info(f"Created repository '{repo_name}'.", repo=repo_name)
         except GithubException as create_err:
-            print(f"Error creating repository '{repo_name}': {create_err}")
+            LOG.error(f"Error creating repository '{repo_name}': {create_err}", repo=repo_name)
             exit(1)
     
     # Ask the user for the execution mode.
-    mode_input = input("Choose execution speed - Enter F for SUPER FAST or S for SLOW: ").strip().lower()
+    mode_input = prompt("Choose execution speed - Enter F for SUPER FAST, A for ADAPTIVE or S for SLOW: ").strip().lower()
     slow_mode = True if mode_input == "s" else False
+    adaptive = mode_input == "a"
     if slow_mode:
-        print("Running in SLOW mode. Concurrency is reduced and delays are added to avoid rate limiting.")
+        LOG.info("Running in SLOW mode. Concurrency is reduced and delays are added to avoid rate limiting.")
+    elif adaptive:
+        LOG.info(f"Running in ADAPTIVE mode. Concurrency is tuned automatically up to {get_max_concurrency(config, slow_mode)}.")
     else:
-        print("Running in SUPER FAST mode. This will use maximum concurrency (use with caution).")
+        LOG.info(f"Running in SUPER FAST mode with up to {get_max_concurrency(config, slow_mode)} concurrent tasks.")
     
     # Prompt for the junk file details.
     try:
-        num_files = int(input("Enter the number of junk files to create/update: "))
-        file_size = int(input("Enter the number of characters (each on its own line) per junk file: "))
+        num_files = int(prompt("Enter the number of junk files to create/update: "))
+        file_size = int(prompt("Enter the number of characters (each on its own line) per junk file: "))
     except ValueError:
-        print("Invalid input. Please enter numeric values.")
+        LOG.error("Invalid input. Please enter numeric values.")
         exit(1)
     
-    # Adjust the number of threads based on the mode.
-    max_workers = 1 if slow_mode else num_files
+    burst = read_int_setting(config, "RATE_LIMIT_BURST", DEFAULT_RATE_LIMIT_BURST)
+    # Files that still fail after their retries, with the status of their last attempt.
+    failed_files = FailureTable(read_int_setting(config, "FAILURES_SPILL_ROWS", DEFAULT_FAILURES_SPILL_ROWS),
+                                config.get("FAILURES_SPILL_DIR") or None)
+    # Contents are generated in worker processes, if GENERATOR_PROCESSES is set, while the uploads go on.
+    pipeline = None
+    if get_engine(config) == "async" and adaptive:
+        LOG.warning("ADAPTIVE mode runs on the threads engine; ENGINE=async is ignored.")
+    if get_engine(config) == "async" and not adaptive:
+        concurrency = get_max_concurrency(config, slow_mode)
+        pipeline = get_content_pipeline(config)
+        asyncio.run(run_repo_async(token, repo.full_name, repo.default_branch, num_files, file_size, config,
+                                   concurrency, RateLimiter(burst=burst), failed_files, pipeline))
+    else:
+        # A single bounded scheduler runs every file task, whatever the number of files.
+        rate_limiter = RateLimiter(github_client, burst=burst)
+        max_workers = get_max_concurrency(config, slow_mode)
+        controller = AdaptiveConcurrency(max_workers) if adaptive else None
+        scheduler = TaskScheduler(max_workers, task_delay=1 if slow_mode else 0, rate_limiter=rate_limiter,
+                                  controller=controller)
+        upload_mode = get_upload_mode(config)
+        if upload_mode == "fastimport":
+            push_url = get_push_url(config, user.login, repo_name)
+            if fast_import_files(push_url, repo.default_branch, range(1, num_files + 1), file_size, config,
+                                 repo_name):
+                LOG.info(f"Pushed {num_files} junk file(s) to repository '{repo_name}'.", repo=repo_name)
+                record_upload(num_files, num_files * max(0, 2 * file_size - 1))
+            else:
+                for i in range(1, num_files + 1):
+                    failed_files.add(repo_name, i, file_size, 1)
+        elif upload_mode == "batch":
+            BatchCommitter(repo, range(1, num_files + 1), file_size, config, scheduler, failed_files).start()
+        else:
+            # Read the existing files once so reruns update them directly instead of hitting 409s.
+            tree_index = build_tree_index(repo)
+            # Commits to one branch go through its lane one at a time; the lane branches are merged
+            # once the last file is done (see CommitLanes).
+            lanes = CommitLanes(repo, read_int_setting(config, "BRANCH_LANES", 1), num_files,
+                                rate_limiter=rate_limiter, failed_files=failed_files, file_size=file_size)
+            lanes.open()
+            pipeline = get_content_pipeline(config)
+            seed = content_seed(config)
+
+            def tasks():
+                for i in range(1, num_files + 1):
+                    # Drawn lazily, so only the files in the scheduler's window have content being generated.
+                    content = pipeline.content(seed, repo.name, i, file_size) if pipeline is not None else None
+                    yield (upload_junk_file,
+                           (repo, i, file_size, config, scheduler, failed_files, tree_index, None, 0, lanes, content),
+                           lanes.lane_for(i))
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(create_junk_file, repo, i, file_size, config)
-            for i in range(1, num_files + 1)
-        ]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                future.result()
-            except Exception as e:
-                print(f"An error occurred during file processing: {e}")
-            if slow_mode:
-                time.sleep(1)
+            # File tasks are drawn lazily through a bounded window instead of being queued all at once.
+            scheduler.submit_each(tasks())
+        scheduler.join()
+    if pipeline is not None:
+        pipeline.close()
+    report_failures(failed_files)
+    failed_files.close()
+    if exporter is not None:
+        exporter.close()
     
 if __name__ == "__main__":
     main()
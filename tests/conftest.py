@@ -0,0 +1,53 @@
+import os
+import sys
+import shutil
+import subprocess
+import importlib.util
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON = os.path.join(ROOT, "common")
+sys.path.insert(0, COMMON)
+sys.path.insert(0, os.path.join(ROOT, "mock"))
+from server import MockGitHub
+
+SCRIPTS = {
+    "org": os.path.join(ROOT, "org", "pyhon.py"),
+    "repo": os.path.join(ROOT, "repo", "python.py"),
+}
+# PyGithub's own pacing (1s between writes by default) would make every run crawl.
+DEFAULT_SETTINGS = {"GITHUB_TOKEN": "test", "ORG_NAME": "mock-org", "REPO_NAME": "junk-single",
+                    "SECONDS_BETWEEN_REQUESTS": "0", "SECONDS_BETWEEN_WRITES": "0"}
+
+@pytest.fixture
+def mock_github():
+    """A MockGitHub served on a free local port for the duration of one test."""
+    mock = MockGitHub(latency=0.002, rate_limit=10 ** 9)
+    mock.start()
+    yield mock
+    mock.stop()
+
+@pytest.fixture(scope="session")
+def org_script():
+    """org/pyhon.py imported as a module."""
+    spec = importlib.util.spec_from_file_location("pyhon", SCRIPTS["org"])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def run_script(tmp_path, mock_github):
+    """
+    Runs a scratch copy of a script against mock_github with a config.txt of DEFAULT_SETTINGS plus the
+    given settings and answers on stdin. Returns the CompletedProcess.
+    """
+    def run(workflow, answers, settings=None, args=()):
+        script = tmp_path / os.path.basename(SCRIPTS[workflow])
+        shutil.copy(SCRIPTS[workflow], script)
+        config = dict(DEFAULT_SETTINGS, API_BASE_URL=mock_github.base_url, **(settings or {}))
+        (tmp_path / "config.txt").write_text("".join(f"{key}={value}\n" for key, value in config.items()))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [COMMON, os.environ.get("PYTHONPATH")])))
+        return subprocess.run([sys.executable, str(script), *args], cwd=tmp_path, input=answers, text=True,
+                              capture_output=True, env=env, timeout=120)
+    return run
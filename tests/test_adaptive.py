@@ -0,0 +1,28 @@
+from junkgen import LATENCY_TOLERANCE, AdaptiveConcurrency
+
+def test_limit_grows_by_one_per_round_of_healthy_tasks():
+    controller = AdaptiveConcurrency(10, initial=2)
+    assert [controller.on_task(1.0, False) for _ in range(5)] == [2, 3, 3, 3, 4]
+
+def test_limit_stays_within_the_maximum():
+    controller = AdaptiveConcurrency(3, initial=2)
+    for _ in range(20):
+        controller.on_task(1.0, False)
+    assert controller.limit == 3
+
+def test_throttling_halves_the_limit_and_holds_it_for_a_round():
+    controller = AdaptiveConcurrency(16, initial=8)
+    assert controller.on_task(1.0, True) == 4
+    # The tasks already in flight do not halve it again.
+    assert [controller.on_task(1.0, True) for _ in range(4)] == [4, 4, 4, 4]
+    assert controller.on_task(1.0, True) == 2
+
+def test_limit_never_drops_below_the_minimum():
+    controller = AdaptiveConcurrency(16, initial=1)
+    assert controller.on_task(1.0, True) == 1
+
+def test_latency_beyond_the_tolerance_halves_the_limit():
+    controller = AdaptiveConcurrency(16, initial=8)
+    controller.on_task(1.0, False)
+    # The smoothed latency moves a fifth of the way towards each new sample.
+    assert controller.on_task(1.0 + 5 * LATENCY_TOLERANCE, False) == 4
@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from types import SimpleNamespace
+
+import junkgen
+from junkgen import MAX_RETRIES, BatchCommitter, FailureTable, TaskScheduler
+
+class FakeRepo:
+    """The Git Data API calls of BatchCommitter, on an in-memory branch."""
+    name = "junk-repo-1"
+    default_branch = "main"
+
+    def __init__(self, failing_blobs=0, sticky=False):
+        # The first failing_blobs uploads fail; with sticky, their contents keep failing afterwards
+        # (CONTENT_SEED makes a retry upload the same content).
+        self.failing_blobs = failing_blobs
+        self.sticky = sticky
+        self.rejected = set()
+        self.lock = threading.Lock()
+        self.commits = {"root": SimpleNamespace(sha="root", tree={})}
+        self.head = "root"
+        self.messages = []
+
+    def create_git_blob(self, content, encoding):
+        with self.lock:
+            if self.failing_blobs or content in self.rejected:
+                self.failing_blobs = max(self.failing_blobs - 1, 0)
+                if self.sticky:
+                    self.rejected.add(content)
+                raise RuntimeError("blob rejected")
+        return SimpleNamespace(sha=hashlib.sha1(content.encode()).hexdigest())
+
+    def get_git_ref(self, ref):
+        assert ref == f"heads/{self.default_branch}"
+        repo = self
+        return SimpleNamespace(object=SimpleNamespace(sha=self.head), edit=lambda sha: setattr(repo, "head", sha))
+
+    def get_git_commit(self, sha):
+        return self.commits[sha]
+
+    def create_git_tree(self, elements, base_tree):
+        tree = dict(base_tree)
+        tree.update((element._identity["path"], element._identity["sha"]) for element in elements)
+        return tree
+
+    def create_git_commit(self, message, tree, parents):
+        assert [parent.sha for parent in parents] == [self.head]
+        commit = SimpleNamespace(sha=f"commit-{len(self.commits)}", tree=tree)
+        self.commits[commit.sha] = commit
+        self.messages.append(message)
+        return commit
+
+def test_files_are_committed_in_batches():
+    repo = FakeRepo()
+    scheduler = TaskScheduler(4)
+    BatchCommitter(repo, range(1, 11), 20, {"FILES_PER_COMMIT": "4"}, scheduler).start()
+    scheduler.join()
+    assert repo.messages == [
+        "Add/Update 4 files with junk content", "Add/Update 4 files with junk content",
+        "Add/Update 2 files with junk content"]
+    assert sorted(repo.commits[repo.head].tree) == sorted(f"junk-{i}.txt" for i in range(1, 11))
+
+def test_failed_blobs_are_retried(monkeypatch):
+    monkeypatch.setattr(junkgen, "retry_delay", lambda attempt: 0)
+    repo = FakeRepo(failing_blobs=2)
+    scheduler = TaskScheduler(1)
+    failed_files = FailureTable()
+    BatchCommitter(repo, range(1, 6), 20, {"FILES_PER_COMMIT": "4"}, scheduler, failed_files).start()
+    scheduler.join()
+    assert len(failed_files) == 0
+    assert sorted(repo.commits[repo.head].tree) == sorted(f"junk-{i}.txt" for i in range(1, 6))
+
+def test_blobs_failing_every_retry_are_left_out_and_reported(monkeypatch):
+    monkeypatch.setattr(junkgen, "retry_delay", lambda attempt: 0)
+    repo = FakeRepo(failing_blobs=1, sticky=True)
+    scheduler = TaskScheduler(1)
+    failed_files = FailureTable()
+    config = {"FILES_PER_COMMIT": "4", "CONTENT_SEED": "seed"}
+    BatchCommitter(repo, range(1, 6), 20, config, scheduler, failed_files).start()
+    scheduler.join()
+    assert list(failed_files) == [(repo.name, 1, 20, MAX_RETRIES + 1, 0)]
+    assert sorted(repo.commits[repo.head].tree) == [f"junk-{i}.txt" for i in range(2, 6)]
+
+def test_retry_delay_grows_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(junkgen.random, "uniform", lambda low, high: high)
+    assert [junkgen.retry_delay(attempt) for attempt in (1, 2, 3)] == [
+        junkgen.RETRY_DELAY, 2 * junkgen.RETRY_DELAY, 4 * junkgen.RETRY_DELAY]
+    assert junkgen.retry_delay(20) == junkgen.RETRY_MAX_DELAY
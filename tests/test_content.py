@@ -0,0 +1,107 @@
+import asyncio
+import base64
+import json
+import subprocess
+
+import pytest
+
+from junkgen import (
+    CONTENT_BLOCK, CONTENT_CHUNK, JUNK_CHARACTERS, ContentPipeline, ContentPool, ContentStream, git_blob_sha,
+    junk_content, random_bytes_newlined, random_string_newlined, streamed_json)
+
+FILE_SIZES = (1, 7, CONTENT_BLOCK, CONTENT_BLOCK + 3, 2 * CONTENT_BLOCK + 11)
+
+@pytest.mark.parametrize("length", [1, 2, 3, 1000, 100000])
+def test_one_junk_character_per_line(length):
+    content = random_bytes_newlined(length)
+    assert len(content) == 2 * length - 1
+    assert content[1::2] == b"\n" * (length - 1)
+    assert set(content[0::2]) <= set(JUNK_CHARACTERS)
+
+def test_every_junk_character_is_drawn():
+    assert set(random_bytes_newlined(100000)[0::2]) == set(JUNK_CHARACTERS)
+
+def test_string_version_decodes_the_bytes():
+    assert random_bytes_newlined(0) == b""
+    assert random_string_newlined(0) == ""
+    assert random_string_newlined(5).count("\n") == 4
+
+@pytest.mark.parametrize("file_size", FILE_SIZES)
+def test_read_at_matches_read(file_size):
+    content = ContentStream("seed", "junk-repo-1", 4, file_size).read()
+    assert len(content) == 2 * file_size - 1
+    assert content[1::2] == b"\n" * (file_size - 1)
+    assert set(content[0::2]) <= set(JUNK_CHARACTERS)
+    stream = ContentStream("seed", "junk-repo-1", 4, file_size)
+    for offset in (0, 1, CONTENT_BLOCK - 1, 2 * CONTENT_BLOCK + 1, len(content) - 1):
+        for size in (1, 2, 3, 2 * CONTENT_BLOCK + 5):
+            assert stream.read_at(offset, size) == content[offset:offset + size]
+    assert stream.read_at(len(content), 10) == b""
+
+@pytest.mark.parametrize("file_size", FILE_SIZES)
+def test_read_in_pieces_matches_read(file_size):
+    content = ContentStream("seed", "junk-repo-1", 4, file_size).read()
+    stream = ContentStream("seed", "junk-repo-1", 4, file_size)
+    pieces = []
+    while True:
+        piece = stream.read(CONTENT_BLOCK // 3 + 1)
+        if not piece:
+            break
+        pieces.append(piece)
+    assert b"".join(pieces) == content
+    assert b"".join(stream.chunks(CONTENT_BLOCK + 1)) == content
+
+@pytest.mark.parametrize("file_size", FILE_SIZES)
+def test_blob_sha_matches_the_content(file_size):
+    stream = ContentStream("seed", "junk-repo-1", 4, file_size)
+    assert stream.blob_sha() == git_blob_sha(stream.read())
+
+def test_streamed_json_encodes_the_content_chunk_by_chunk():
+    stream = ContentStream("seed", "junk-repo-1", 4, CONTENT_CHUNK // 2 + 10)
+
+    async def collect():
+        return b"".join([piece async for piece in streamed_json({"message": "Add"}, stream)])
+
+    body = json.loads(asyncio.run(collect()))
+    assert body["message"] == "Add"
+    assert base64.b64decode(body["content"]) == stream.read_at(0, stream.size)
+
+def test_content_depends_on_seed_repo_and_file():
+    contents = {ContentStream(*key, 50).read()
+                for key in (("seed", "junk-repo-1", 1), ("other", "junk-repo-1", 1),
+                            ("seed", "junk-repo-2", 1), ("seed", "junk-repo-1", 2))}
+    assert len(contents) == 4
+    config = {"CONTENT_SEED": "seed"}
+    assert junk_content(config, "junk-repo-1", 1, 50) == ContentStream("seed", "junk-repo-1", 1, 50).read()
+
+def test_pipeline_generates_the_same_content():
+    pipeline = ContentPipeline(2)
+    try:
+        content = ContentStream("seed", "junk-repo-1", 3, 100).read()
+        assert pipeline.content("seed", "junk-repo-1", 3, 100).result() == content
+        sha, text = pipeline.payload("seed", "junk-repo-1", 3, 100).result()
+        assert sha == git_blob_sha(content)
+        assert base64.b64decode(text) == content
+    finally:
+        pipeline.close()
+
+def test_pool_windows_are_reproducible_slices_of_the_pool():
+    pool = ContentPool("seed", 1000)
+    window = pool.window("junk-repo-1", 3, 50)
+    assert len(window) == 99
+    assert window[1::2] == b"\n" * 49
+    assert bytes(window) in ContentStream("seed", "", 0, 1000).read()
+    assert ContentPool("seed", 1000).window("junk-repo-1", 3, 50) == window
+    assert pool.window("junk-repo-1", 3, 1001) is None
+
+def test_junk_content_falls_back_to_the_stream_for_files_larger_than_the_pool():
+    config = {"CONTENT_SEED": "seed", "CONTENT_POOL_SIZE": "100"}
+    assert isinstance(junk_content(config, "junk-repo-1", 1, 20), memoryview)
+    assert junk_content(config, "junk-repo-1", 1, 200) == ContentStream("seed", "junk-repo-1", 1, 200).read()
+
+def test_git_blob_sha_matches_git(tmp_path):
+    content = random_bytes_newlined(1000)
+    path = tmp_path / "junk-1.txt"
+    path.write_bytes(content)
+    expected = subprocess.run(["git", "hash-object", str(path)], capture_output=True, text=True, check=True)
+    assert git_blob_sha(content) == expected.stdout.strip()
@@ -0,0 +1,46 @@
+import io
+import json
+import threading
+
+from junkgen import LOG_LEVELS, EventLog
+
+def test_messages_below_the_level_are_dropped():
+    log = EventLog()
+    log.stream = io.StringIO()
+    log.threshold = LOG_LEVELS["info"]
+    log.file("  • Created file 'junk-1.txt'")
+    log.info("Created repository 'junk-repo-1'.")
+    log.error("Error connecting to GitHub")
+    log.close()
+    assert log.stream.getvalue() == "Created repository 'junk-repo-1'.\nError connecting to GitHub\n"
+
+def test_json_lines_carry_the_level_and_fields():
+    log = EventLog()
+    log.stream = io.StringIO()
+    log.json = True
+    log.file("  • Created file 'junk-1.txt'", repo="junk-repo-1", file=1)
+    log.close()
+    record = json.loads(log.stream.getvalue())
+    assert record["level"] == "file"
+    assert record["message"] == "Created file 'junk-1.txt'"
+    assert (record["repo"], record["file"]) == ("junk-repo-1", 1)
+
+def test_messages_of_every_thread_are_written_once_in_order_per_thread():
+    log = EventLog()
+    log.stream = io.StringIO()
+
+    def worker(name):
+        for i in range(200):
+            log.file(f"{name} {i}")
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.flush()
+    lines = log.stream.getvalue().splitlines()
+    assert len(lines) == 800
+    for name in "abcd":
+        assert [line for line in lines if line.startswith(name)] == [f"{name} {i}" for i in range(200)]
+    log.close()
@@ -0,0 +1,20 @@
+from junkgen import FailureTable
+
+def test_rows_keep_their_repository_name_and_status():
+    table = FailureTable()
+    table.add("junk-repo-1", 3, 100, 4, 502)
+    table.add("junk-repo-2", 1, 100, 4)
+    table.add("junk-repo-1", 7, 100, 300, 409)
+    assert list(table) == [
+        ("junk-repo-1", 3, 100, 4, 502), ("junk-repo-2", 1, 100, 4, 0), ("junk-repo-1", 7, 100, 255, 409)]
+    assert table.repo_names == ["junk-repo-1", "junk-repo-2"]
+    assert table.status_counts() == {502: 1, 0: 1, 409: 1}
+
+def test_rows_beyond_the_limit_spill_to_disk(tmp_path):
+    table = FailureTable(spill_rows=4, spill_dir=str(tmp_path))
+    for i in range(10):
+        table.add(f"junk-repo-{i % 3}", i, 50, 1, 500)
+    assert len(table) == 10
+    assert len(table._columns[0]) == 2
+    assert list(table) == [(f"junk-repo-{i % 3}", i, 50, 1, 500) for i in range(10)]
+    table.close()
@@ -0,0 +1,25 @@
+import subprocess
+
+from junkgen import fast_import_files
+
+def git(remote, *args):
+    return subprocess.run(["git", "-C", str(remote), *args], capture_output=True, text=True, check=True).stdout
+
+def test_files_are_pushed_to_a_bare_remote(tmp_path):
+    remote = tmp_path / "junk-repo-1.git"
+    git(tmp_path, "init", "--quiet", "--bare", str(remote))
+    config = {"FAST_IMPORT_DIR": str(tmp_path)}
+    assert fast_import_files(str(remote), "main", range(1, 6), 20, config)
+    assert fast_import_files(str(remote), "main", range(4, 9), 30, config)
+    # The second push goes on top of the first one.
+    assert git(remote, "rev-list", "--count", "main").strip() == "2"
+    files = git(remote, "ls-tree", "--name-only", "main").split()
+    assert sorted(files) == sorted(f"junk-{i}.txt" for i in range(1, 9))
+    content = git(remote, "show", "main:junk-8.txt")
+    assert len(content) == 2 * 30 - 1
+    assert content[1::2] == "\n" * 29
+    # The temporary repositories are removed.
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["junk-repo-1.git"]
+
+def test_failed_push_returns_false(tmp_path):
+    assert not fast_import_files(str(tmp_path / "missing.git"), "main", range(1, 3), 10, {})
@@ -0,0 +1,55 @@
+def test_journal_records_the_plan_repositories_and_files(tmp_path, org_script):
+    path = tmp_path / "journal.log"
+    journal = org_script.RunJournal(str(path))
+    assert not journal.load()
+    journal.start(2, 20, 5)
+    journal.record_repo("junk-repo-1")
+    journal.record_files("junk-repo-1", [3, 1])
+    journal.close()
+    assert path.read_text() == "plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\nfile junk-repo-1 1\n"
+    loaded = org_script.RunJournal(str(path))
+    assert loaded.load()
+    assert loaded.plan == (2, 20, 5)
+    assert loaded.repos == {"junk-repo-1"}
+    assert loaded.files == {"junk-repo-1": {1, 3}}
+
+def test_resume_appends(tmp_path, org_script):
+    path = tmp_path / "journal.log"
+    path.write_text("plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\n")
+    journal = org_script.RunJournal(str(path))
+    journal.load()
+    journal.start(*journal.plan, resume=True)
+    journal.record_files("junk-repo-1", [4])
+    journal.close()
+    assert path.read_text() == "plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\nfile junk-repo-1 4\n"
+
+def test_load_skips_a_partial_last_line(tmp_path, org_script):
+    path = tmp_path / "journal.log"
+    path.write_text("plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\nfile junk-repo-1 1")
+    journal = org_script.RunJournal(str(path))
+    assert journal.load()
+    assert journal.repos == {"junk-repo-1"}
+    assert journal.files == {"junk-repo-1": {3}}
+
+def test_resume_drops_the_partial_line_and_appends(tmp_path, org_script):
+    path = tmp_path / "journal.log"
+    path.write_text("plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\nfile junk-rep")
+    journal = org_script.RunJournal(str(path))
+    journal.load()
+    journal.start(*journal.plan, resume=True)
+    journal.record_files("junk-repo-1", [4, 5])
+    journal.close()
+    assert path.read_text() == ("plan 2 20 5\nrepo junk-repo-1\nfile junk-repo-1 3\n"
+                                "file junk-repo-1 4\nfile junk-repo-1 5\n")
+    resumed = org_script.RunJournal(str(path))
+    assert resumed.load()
+    assert resumed.files == {"junk-repo-1": {3, 4, 5}}
+
+def test_new_run_starts_a_fresh_journal(tmp_path, org_script):
+    path = tmp_path / "journal.log"
+    path.write_text("plan 2 20 5\nrepo junk-repo-1\n")
+    journal = org_script.RunJournal(str(path))
+    journal.start(3, 4, 5)
+    journal.record_repo("junk-repo-2")
+    journal.close()
+    assert path.read_text() == "plan 3 4 5\nrepo junk-repo-2\n"
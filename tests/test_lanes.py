@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from github import GithubException
+
+import junkgen
+from junkgen import LANE_BRANCH_PREFIX, MAX_RETRIES, CommitLanes, FailureTable, TaskScheduler
+
+class FakeRepo:
+    """The branch calls of CommitLanes."""
+    name = "junk-repo-1"
+    full_name = "junk-org/junk-repo-1"
+    default_branch = "main"
+
+    def __init__(self, failing_merges=0):
+        self.branches = {"main": "head"}
+        self.merged = []
+        self.failing_merges = failing_merges
+
+    def get_branch(self, branch):
+        return SimpleNamespace(commit=SimpleNamespace(sha=self.branches[branch]))
+
+    def create_git_ref(self, ref, sha):
+        self.branches[ref[len("refs/heads/"):]] = sha
+
+    def merge(self, base, head, message):
+        if self.failing_merges:
+            self.failing_merges -= 1
+            raise GithubException(409, {"message": "Merge conflict"})
+        self.merged.append((base, head))
+
+    def get_git_ref(self, ref):
+        branch = ref[len("heads/"):]
+        return SimpleNamespace(delete=lambda: self.branches.pop(branch))
+
+def test_tasks_of_one_lane_run_one_at_a_time_in_order():
+    scheduler = TaskScheduler(4)
+    lock = threading.Lock()
+    running = {"a": 0, "b": 0}
+    overlaps = []
+    order = []
+
+    def task(lane, i):
+        with lock:
+            running[lane] += 1
+            overlaps.append(running[lane] > 1)
+            order.append((lane, i))
+        time.sleep(0.01)
+        with lock:
+            running[lane] -= 1
+
+    for i in range(5):
+        scheduler.submit(task, "a", i, lane="a")
+        scheduler.submit(task, "b", i, lane="b")
+    scheduler.join()
+    assert not any(overlaps)
+    assert [i for lane, i in order if lane == "a"] == list(range(5))
+    assert [i for lane, i in order if lane == "b"] == list(range(5))
+
+def test_files_are_spread_over_the_lanes_and_merged_after_the_last_one():
+    repo = FakeRepo()
+    lanes = CommitLanes(repo, 3, 6)
+    lanes.open()
+    assert lanes.branches == ["main", f"{LANE_BRANCH_PREFIX}1", f"{LANE_BRANCH_PREFIX}2"]
+    assert [lanes.branch_for(i) for i in range(1, 7)] == [lanes.branches[i % 3] for i in range(1, 7)]
+    scheduler = TaskScheduler(2)
+    for _ in range(5):
+        lanes.file_done(scheduler)
+    scheduler.join()
+    assert repo.merged == []
+    lanes.file_done(scheduler)
+    scheduler.join()
+    assert repo.merged == [("main", f"{LANE_BRANCH_PREFIX}1"), ("main", f"{LANE_BRANCH_PREFIX}2")]
+    assert list(repo.branches) == ["main"]
+
+def test_a_single_lane_uses_the_default_branch_only():
+    repo = FakeRepo()
+    lanes = CommitLanes(repo, 1, 2)
+    lanes.open()
+    assert lanes.branch_for(1) == lanes.branch_for(2) == "main"
+    assert lanes.lane_for(1) == (repo.full_name, "main")
+
+def written_lanes(repo, failed_files, monkeypatch):
+    """Lanes of 2 branches over 4 files, all written, with retries that do not wait."""
+    monkeypatch.setattr(junkgen, "retry_delay", lambda attempt: 0)
+    lanes = CommitLanes(repo, 2, 4, failed_files=failed_files, file_size=10)
+    lanes.open()
+    scheduler = TaskScheduler(2)
+    for i in range(1, 5):
+        lanes.file_written(i)
+        lanes.file_done(scheduler)
+    scheduler.join()
+    return lanes
+
+def test_a_failed_merge_is_retried(monkeypatch):
+    repo = FakeRepo(failing_merges=MAX_RETRIES)
+    failed_files = FailureTable()
+    written_lanes(repo, failed_files, monkeypatch)
+    assert repo.merged == [("main", f"{LANE_BRANCH_PREFIX}1")]
+    assert list(repo.branches) == ["main"]
+    assert len(failed_files) == 0
+
+def test_the_files_of_a_branch_that_cannot_be_merged_fail(monkeypatch):
+    repo = FakeRepo(failing_merges=MAX_RETRIES + 1)
+    failed_files = FailureTable()
+    written_lanes(repo, failed_files, monkeypatch)
+    assert repo.merged == []
+    assert list(repo.branches) == ["main", f"{LANE_BRANCH_PREFIX}1"]
+    # Files 1 and 3 went to the lane branch, 2 and 4 to the default branch.
+    assert sorted(file_index for _, file_index, _, _, _ in failed_files) == [1, 3]
+    assert failed_files.status_counts() == {409: 2}
+
+def test_async_engine_fails_the_files_of_a_branch_that_cannot_be_merged(monkeypatch):
+    monkeypatch.setattr(junkgen, "retry_delay", lambda attempt: 0)
+    engine = junkgen.AsyncEngine("token", {}, 2)
+    requests = []
+
+    async def request(method, path, payload=None, stream=None):
+        requests.append((method, path))
+        if path.endswith("/merges"):
+            return (409, {}, {"message": "Merge conflict"}) if payload["head"].endswith("1") else (201, {}, {})
+        return 204, {}, None
+
+    engine.request = request
+    failed_files = FailureTable()
+    branches = ["main", f"{LANE_BRANCH_PREFIX}1", f"{LANE_BRANCH_PREFIX}2"]
+    written = {branches[1]: [1, 4], branches[2]: [2, 5]}
+    merged = asyncio.run(engine.merge_lanes("junk-org/junk-repo-1", branches, written, failed_files, 10))
+    assert merged == [branches[2]]
+    assert requests.count(("POST", "/repos/junk-org/junk-repo-1/merges")) == MAX_RETRIES + 2
+    assert sorted(row[:2] for row in failed_files) == [("junk-repo-1", 1), ("junk-repo-1", 4)]
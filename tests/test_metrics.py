@@ -0,0 +1,38 @@
+from junkgen import METRIC_BUCKETS, Metrics, api_endpoint
+
+def test_render_writes_the_prometheus_text_format():
+    metrics = Metrics()
+    metrics.inc("junk_requests_total", method="PUT", endpoint="contents", status=201)
+    metrics.inc("junk_requests_total", 2, method="PUT", endpoint="contents", status=201)
+    metrics.inc("junk_requests_total", method="GET", endpoint="git/trees", status=404)
+    metrics.gauge("junk_queue_depth", lambda: 7)
+    lines = metrics.render().splitlines()
+    assert lines[:2] == ["# HELP junk_queue_depth Tasks (or async requests) waiting to run.",
+                         "# TYPE junk_queue_depth gauge"]
+    assert "junk_queue_depth 7" in lines
+    assert "# TYPE junk_requests_total counter" in lines
+    assert 'junk_requests_total{endpoint="contents",method="PUT",status="201"} 3' in lines
+    assert 'junk_requests_total{endpoint="git/trees",method="GET",status="404"} 1' in lines
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    for value in (0.001, 0.02, 0.02, 100):
+        metrics.observe("junk_request_duration_seconds", value, endpoint="contents")
+    lines = metrics.render().splitlines()
+    name = 'junk_request_duration_seconds_bucket{endpoint="contents",le="%s"}'
+    assert f"{name % METRIC_BUCKETS[0]} 1" in lines
+    assert f"{name % 0.025} 3" in lines
+    assert f"{name % METRIC_BUCKETS[-1]} 4" in lines
+    assert f"{name % '+Inf'} 4" in lines
+    assert 'junk_request_duration_seconds_count{endpoint="contents"} 4' in lines
+    assert 'junk_request_duration_seconds_sum{endpoint="contents"} 100.041' in lines
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc("junk_requests_total", method='P"T', endpoint="a\\b", status="1\n2")
+    assert 'junk_requests_total{endpoint="a\\\\b",method="P\\"T",status="1\\n2"} 1' in metrics.render()
+
+def test_api_endpoint_labels():
+    assert api_endpoint("https://api.github.com/repos/o/r/contents/junk-1.txt") == "contents"
+    assert api_endpoint("/repos/o/r/git/refs/heads/main") == "git/refs"
+    assert api_endpoint("/emojis") == "other"
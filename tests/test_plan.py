@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+
+from junkgen import TaskScheduler, git_blob_sha, junk_content
+
+class FakeRepo:
+    default_branch = "main"
+
+    def __init__(self, name, files):
+        self.name = name
+        self.files = files
+
+    def get_git_tree(self, ref, recursive=False):
+        return SimpleNamespace(tree=[SimpleNamespace(path=path, sha=sha, size=len(content), type="blob")
+                                     for path, (sha, content) in self.files.items()])
+
+class FakeOrg:
+    def __init__(self, repos):
+        self.repos = repos
+
+    def get_repos(self):
+        return iter(self.repos)
+
+def junk_files(config, repo_name, file_indexes, file_size):
+    files = {}
+    for i in file_indexes:
+        content = junk_content(config, repo_name, i, file_size)
+        files[f"junk-{i}.txt"] = (git_blob_sha(content), content)
+    return files
+
+def test_plan_lists_only_the_missing_work(org_script):
+    config = {}
+    complete = FakeRepo("junk-repo-1", junk_files(config, "junk-repo-1", range(1, 5), 10))
+    partial = FakeRepo("junk-repo-2", junk_files(config, "junk-repo-2", range(1, 4), 10))
+    partial.files["junk-3.txt"] = ("short", b"x")
+    org = FakeOrg([complete, partial, FakeRepo("other", {})])
+    plan = org_script.plan_org(org, 3, 4, 10, config, TaskScheduler(2))
+    assert sorted(plan) == ["junk-repo-2", "junk-repo-3"]
+    assert plan["junk-repo-2"][0] is partial
+    assert plan["junk-repo-2"][2] == [3, 4]
+    assert plan["junk-repo-3"] == (None, {}, [1, 2, 3, 4])
+
+def test_seeded_plan_compares_blob_shas(org_script):
+    config = {"CONTENT_SEED": "seed"}
+    repo = FakeRepo("junk-repo-1", junk_files(config, "junk-repo-1", range(1, 4), 10))
+    # Same size, other content.
+    repo.files["junk-2.txt"] = junk_files({"CONTENT_SEED": "other"}, "junk-repo-1", [2], 10)["junk-2.txt"]
+    plan = org_script.plan_org(FakeOrg([repo]), 1, 3, 10, config, TaskScheduler(2))
+    assert plan["junk-repo-1"][2] == [2]
+
+@pytest.mark.parametrize("settings, calls", [
+    ({}, 1 + 10 + 5),
+    ({"UPLOAD_MODE": "batch", "FILES_PER_COMMIT": "4"}, 1 + (10 + 3 * 3 + 2) + (5 + 3 * 2 + 2)),
+    ({"UPLOAD_MODE": "fastimport"}, 1),
+])
+def test_estimate_api_calls(org_script, settings, calls):
+    plan = {"junk-repo-1": (None, {}, list(range(1, 11))),
+            "junk-repo-2": (FakeRepo("junk-repo-2", {}), {}, [1, 2, 3, 4, 5])}
+    assert org_script.estimate_api_calls(plan, settings) == calls
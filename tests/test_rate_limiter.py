@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+from junkgen import RATE_LIMIT_DELAY, RateLimiter, get_client_options
+
+def test_requests_are_not_paced_before_headers_are_seen():
+    limiter = RateLimiter(burst=1)
+    assert all(limiter.reserve() == 0 for _ in range(100))
+
+def test_bucket_spends_the_remaining_quota_evenly():
+    limiter = RateLimiter(burst=2)
+    limiter.update(remaining=10, reset_time=time.time() + 10)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    # The burst is spent; the next token comes in about 1 / (10 requests / 10 seconds).
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.1)
+
+def test_exhausted_quota_blocks_until_the_reset():
+    limiter = RateLimiter()
+    limiter.update(remaining=0, reset_time=time.time() + 30)
+    assert limiter.reserve() == pytest.approx(30, abs=1)
+
+@pytest.mark.parametrize("headers, delay", [
+    ({"Retry-After": "12"}, 12),
+    ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 40)}, 40),
+    ({}, RATE_LIMIT_DELAY),
+    ({"Retry-After": "soon"}, RATE_LIMIT_DELAY),
+])
+def test_throttle_blocks_for_the_delay_from_the_headers(headers, delay):
+    limiter = RateLimiter()
+    assert limiter.throttle(headers) == pytest.approx(delay, abs=2)
+    assert limiter.reserve() == pytest.approx(delay, abs=2)
+
+@pytest.mark.parametrize("status", [403, 429])
+def test_clients_leave_rate_limit_responses_to_the_limiter(status):
+    retry = get_client_options({})["retry"]
+    assert not retry.is_retry("PUT", status, has_retry_after=True)
@@ -0,0 +1,86 @@
+import time
+import threading
+
+from junkgen import TaskScheduler
+
+def test_submit_each_draws_tasks_through_a_bounded_window():
+    scheduler = TaskScheduler(4)
+    lock = threading.Lock()
+    window = {"drawn": 0, "peak": 0, "done": 0}
+
+    def drawn(tasks):
+        # Counts the tasks drawn from the iterable and not finished yet.
+        for fn, args, lane in tasks:
+            with lock:
+                window["drawn"] += 1
+                window["peak"] = max(window["peak"], window["drawn"])
+            yield fn, args, lane
+
+    def task():
+        time.sleep(0.001)
+        with lock:
+            window["drawn"] -= 1
+            window["done"] += 1
+
+    scheduler.submit_each(drawn((task, (), None) for _ in range(100)))
+    scheduler.join()
+    assert window["done"] == 100
+    assert window["peak"] <= 2 * scheduler.max_workers
+
+def test_join_returns_when_drawing_the_next_task_fails():
+    scheduler = TaskScheduler(2, window=1)
+    done = []
+
+    def tasks():
+        for i in range(3):
+            yield done.append, (i,), None
+        raise RuntimeError("generator pool broken")
+
+    scheduler.submit_each(tasks())
+    joined = threading.Thread(target=scheduler.join, daemon=True)
+    joined.start()
+    joined.join(5)
+    assert not joined.is_alive()
+    assert done == [0, 1, 2]
+
+def test_nested_submit_each_share_one_window():
+    scheduler = TaskScheduler(4)
+    lock = threading.Lock()
+    window = {"drawn": 0, "peak": 0, "done": 0}
+
+    def drawn(tasks):
+        # Counts the tasks drawn from the iterable and not finished yet.
+        for fn, args, lane in tasks:
+            with lock:
+                window["drawn"] += 1
+                window["peak"] = max(window["peak"], window["drawn"])
+            yield fn, args, lane
+
+    def file_task():
+        time.sleep(0.001)
+        with lock:
+            window["drawn"] -= 1
+            window["done"] += 1
+
+    def repo_task():
+        with lock:
+            window["drawn"] -= 1
+        scheduler.submit_each(drawn((file_task, (), None) for _ in range(20)))
+
+    scheduler.submit_each(drawn((repo_task, (), None) for _ in range(10)))
+    scheduler.join()
+    assert window["done"] == 200
+    assert window["peak"] <= scheduler.window
+
+def test_window_holds_back_tasks_of_a_full_lane():
+    scheduler = TaskScheduler(2)
+    queued = []
+
+    def task():
+        queued.append(scheduler.queue_depth())
+        time.sleep(0.001)
+
+    scheduler.submit_each((task, (), "lane") for _ in range(20))
+    scheduler.join()
+    assert len(queued) == 20
+    assert max(queued) < TaskScheduler.lane_window
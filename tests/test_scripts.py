@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from github import GithubException
+
+from junkgen import MAX_RETRIES, ContentStream, FailureTable, TaskScheduler
+
+def test_repo_script_writes_every_file(mock_github, run_script):
+    result = run_script("repo", "F\n3\n20\n", {"MAX_CONCURRENCY": 4, "CONTENT_SEED": "test"})
+    assert result.returncode == 0, result.stderr
+    assert "All files created/updated successfully." in result.stdout
+    repo = mock_github.repos[f"{mock_github.login}/junk-single"]
+    files = repo.head_files(repo.default_branch)
+    for i in range(1, 4):
+        assert files[f"junk-{i}.txt"] == ContentStream("test", "junk-single", i, 20).blob_sha()
+
+@pytest.mark.parametrize("lanes", [1, 3])
+def test_repo_script_async_engine_writes_every_file(mock_github, run_script, lanes):
+    result = run_script("repo", "F\n12\n20\n", {"ENGINE": "async", "BRANCH_LANES": lanes, "MAX_CONCURRENCY": 8,
+                                                "CONTENT_SEED": "test"})
+    assert result.returncode == 0, result.stderr
+    assert "All files created/updated successfully." in result.stdout
+    repo = mock_github.repos[f"{mock_github.login}/junk-single"]
+    files = repo.head_files(repo.default_branch)
+    for i in range(1, 13):
+        assert files[f"junk-{i}.txt"] == ContentStream("test", "junk-single", i, 20).blob_sha()
+    # Lane branches are merged and deleted.
+    assert list(repo.refs) == [repo.default_branch]
+
+def test_adaptive_mode_backs_off_when_throttled(mock_github, run_script, tmp_path):
+    mock_github.max_concurrent = 2
+    result = run_script("repo", "A\n12\n20\n", {"BRANCH_LANES": 4, "MAX_CONCURRENCY": 8,
+                                                "METRICS_TEXTFILE": tmp_path / "junk.prom"})
+    assert result.returncode == 0, result.stderr
+    assert "All files created/updated successfully." in result.stdout
+    metrics = dict(line.split() for line in (tmp_path / "junk.prom").read_text().splitlines()
+                   if line.startswith(("junk_rate_limit_throttles_total ", "junk_concurrency_limit ")))
+    assert mock_github.rejected > 0
+    assert float(metrics["junk_rate_limit_throttles_total"]) == mock_github.rejected
+    assert float(metrics["junk_concurrency_limit"]) < 8
+
+def test_adaptive_mode_falls_back_to_the_threads_engine(mock_github, run_script):
+    result = run_script("repo", "A\n3\n20\n", {"ENGINE": "async"})
+    assert result.returncode == 0, result.stderr
+    assert "ADAPTIVE mode runs on the threads engine" in result.stdout + result.stderr
+    assert "All files created/updated successfully." in result.stdout
+
+class FlakyEngine:
+    """
+    An AsyncEngine whose connection drops while opening the lanes of repositories named *-2, and that
+    answers the creation of the repositories in failing_creates with a 403 that many times.
+    """
+
+    uploaded = []
+    failing_creates = {}
+
+    def __init__(self, token, config, concurrency, rate_limiter=None, pipeline=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def create_repo(self, owner_path, name):
+        if self.failing_creates.get(name):
+            self.failing_creates[name] -= 1
+            return 403, {"message": "You have exceeded a secondary rate limit."}
+        return 201, {"full_name": f"junk-org/{name}", "default_branch": "main"}
+
+    async def open_lanes(self, full_name, default_branch, num_lanes):
+        if full_name.endswith("-2"):
+            raise ConnectionResetError("Server disconnected")
+        return [default_branch]
+
+    async def upload_junk_file(self, full_name, file_index, file_size, tree_index=None, branch=None):
+        self.uploaded.append((full_name, file_index))
+        return True
+
+    async def merge_lanes(self, full_name, branches, written=None, failed_files=None, file_size=0):
+        return []
+
+@pytest.fixture
+def flaky_engine(org_script, monkeypatch):
+    monkeypatch.setattr(org_script, "AsyncEngine", FlakyEngine)
+    monkeypatch.setattr(org_script, "retry_delay", lambda attempt: 0)
+    monkeypatch.setattr(FlakyEngine, "uploaded", [])
+    monkeypatch.setattr(FlakyEngine, "failing_creates", {})
+    return FlakyEngine
+
+def test_async_org_run_goes_on_after_a_repository_error(org_script, flaky_engine):
+    asyncio.run(org_script.run_org_async("token", "junk-org", 3, 2, 10, {"REPO_NAME_PREFIX": "r-"}, 4,
+                                         None, FailureTable()))
+    assert sorted(flaky_engine.uploaded) == [("junk-org/r-1", 1), ("junk-org/r-1", 2),
+                                             ("junk-org/r-3", 1), ("junk-org/r-3", 2)]
+
+def test_async_org_run_retries_repository_creation(org_script, flaky_engine):
+    flaky_engine.failing_creates.update({"r-1": MAX_RETRIES, "r-3": MAX_RETRIES + 1})
+    failed_repos = []
+    asyncio.run(org_script.run_org_async("token", "junk-org", 3, 1, 10, {"REPO_NAME_PREFIX": "r-"}, 4,
+                                         None, FailureTable(), failed_repos=failed_repos))
+    assert flaky_engine.uploaded == [("junk-org/r-1", 1)]
+    assert failed_repos == ["r-3"]
+
+class FlakyOrg:
+    """An organization whose creation of the repositories in failing_creates fails that many times."""
+
+    def __init__(self, failing_creates):
+        self.failing_creates = failing_creates
+        self.created = []
+
+    def create_repo(self, name, **kwargs):
+        if self.failing_creates.get(name):
+            self.failing_creates[name] -= 1
+            raise GithubException(500, {"message": "Server Error"})
+        self.created.append(name)
+        return SimpleNamespace(name=name)
+
+def test_repository_creation_is_retried(org_script, monkeypatch):
+    monkeypatch.setattr(org_script, "retry_delay", lambda attempt: 0)
+    org = FlakyOrg({"r-1": MAX_RETRIES, "r-2": MAX_RETRIES + 1})
+    scheduler = TaskScheduler(2)
+    failed_repos = []
+    scheduler.submit_each((org_script.process_repo, (i, 0, 10, org, {"REPO_NAME_PREFIX": "r-"}, scheduler,
+                                                     FailureTable(), None, None, failed_repos), None)
+                          for i in (1, 2))
+    scheduler.join()
+    assert org.created == ["r-1"]
+    assert failed_repos == ["r-2"]
@@ -0,0 +1,51 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+class FakeGithub:
+    """A client per token that hands out organization and repository objects tagged with the token."""
+
+    def __init__(self, token, **options):
+        self.token = token
+        self.fetched = []
+
+    def get_organization(self, name):
+        return SimpleNamespace(login=name, token=self.token)
+
+    def get_repo(self, full_name):
+        self.fetched.append(full_name)
+        return SimpleNamespace(full_name=full_name, token=self.token)
+
+@pytest.fixture
+def pool(org_script, monkeypatch):
+    monkeypatch.setattr(org_script, "Github", FakeGithub)
+    pool = org_script.TokenPool("junk-org", ["token-a", "token-b"], burst=1)
+    reset_time = time.time() + 60
+    pool.entries[0]["limiter"].update(remaining=100, reset_time=reset_time)
+    pool.entries[1]["limiter"].update(remaining=500, reset_time=reset_time)
+    return pool
+
+def test_reserve_picks_the_token_with_the_most_quota_left(pool):
+    assert pool.reserve() == 0
+    assert pool.org_for(None).token == "token-b"
+
+def test_a_throttled_token_is_skipped(pool):
+    pool.reserve()
+    pool.throttle({"Retry-After": "30"})
+    assert pool.reserve() == 0
+    assert pool.org_for(None).token == "token-a"
+    assert pool.throttles == 1
+
+def test_every_token_throttled_returns_the_shortest_wait(pool):
+    for retry_after in ("30", "10"):
+        pool.reserve()
+        pool.throttle({"Retry-After": retry_after})
+    assert pool.reserve() == pytest.approx(10, abs=1)
+
+def test_repositories_are_fetched_once_per_token(pool):
+    repo = SimpleNamespace(full_name="junk-org/junk-repo-1", token="token-a")
+    pool.reserve()
+    assert pool.repo_for(repo).token == "token-b"
+    assert pool.repo_for(repo).token == "token-b"
+    assert pool.entries[1]["client"].fetched == ["junk-org/junk-repo-1"]